@@ -1,7 +1,7 @@
 from typing import Dict, List
 import os
 import logging
-from services.email_service import email_service
+from services.email_service import get_email_service
 from services.utils import get_job_field, sanitize_filename
 
 # Get logger
@@ -82,7 +82,7 @@ class ApplicationAgent:
             logger.warning("No valid CV file available for application")
         
         # Send the email with attachments
-        result = email_service.send_job_application(
+        result = get_email_service().send_job_application(
             recipient_email=recipient_email,
             job_title=job_title,
             company=company,
@@ -1,6 +1,6 @@
-import json
 import os
 from typing import List, Dict, Optional
+from services.utils import load_json_file, save_json_file
 
 class JobFetcherAgent:
     """
@@ -20,13 +20,11 @@ class JobFetcherAgent:
         """
         job_offers_path = os.path.join(self.data_dir, 'job_offers.json')
         
-        try:
-            with open(job_offers_path, 'r', encoding='utf-8') as f:
-                jobs = json.load(f)
-            return jobs
-        except Exception as e:
-            print(f"Error loading job offers: {str(e)}")
+        jobs = load_json_file(job_offers_path)
+        if jobs is None:
+            print("Error loading job offers")
             return []
+        return jobs
     
     def fetch_jobs_by_type(self, job_type: str) -> List[Dict]:
         """
@@ -148,10 +146,7 @@ class JobFetcherAgent:
             
             # Save back to file
             job_offers_path = os.path.join(self.data_dir, 'job_offers.json')
-            with open(job_offers_path, 'w', encoding='utf-8') as f:
-                json.dump(all_jobs, f, indent=2, ensure_ascii=False)
-            
-            return True
+            return save_json_file(job_offers_path, all_jobs)
         except Exception as e:
             print(f"Error adding job offer: {str(e)}")
             return False
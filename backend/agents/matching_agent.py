@@ -1,6 +1,9 @@
 from typing import List, Dict, Tuple
 from services.nlp_service import nlp_service
-from services.utils import create_cv_summary, create_job_summary, calculate_match_score
+from services.utils import (
+    create_cv_summary, create_job_summary, calculate_match_score, cv_skill_set, job_skill_set,
+    score_batch
+)
 
 class MatchingAgent:
     """
@@ -34,16 +37,15 @@ class MatchingAgent:
         
         matches = []
         
-        for job in job_offers:
-            # Create job summary
-            job_summary = create_job_summary(job)
-            
-            # Compute similarity
-            similarity_score = nlp_service.compute_similarity(cv_summary, job_summary)
-            
-            # Calculate overall match score
-            match_score = calculate_match_score(cv_data, job, similarity_score)
-            
+        # Compute similarity with every job summary in one batch
+        job_summaries = [create_job_summary(job) for job in job_offers]
+        similarity_matrix = nlp_service.compute_similarity_matrix([cv_summary], job_summaries)
+        similarity_scores = similarity_matrix[0]
+        match_scores = score_batch([cv_data], job_offers, similarity_matrix)[0]
+        
+        for job, similarity_score, match_score in zip(
+            job_offers, similarity_scores.tolist(), match_scores.tolist()
+        ):
             # Add match score to job data
             job_with_score = job.copy()
             job_with_score['match_score'] = round(match_score, 2)
@@ -96,13 +98,7 @@ class MatchingAgent:
         match_score = calculate_match_score(cv_data, job_data, similarity_score)
         
         # Find matching skills
-        cv_skills = set([s.lower() for s in cv_data.get('skills', [])])
-        job_requirements = job_data.get('requirements', [])
-        job_skills = set()
-        for req in job_requirements:
-            job_skills.update([word.lower() for word in req.split() if len(word) > 3])
-        
-        matching_skills = list(cv_skills.intersection(job_skills))
+        matching_skills = list(cv_skill_set(cv_data) & job_skill_set(job_data))
         
         return {
             'match_score': round(match_score, 2),
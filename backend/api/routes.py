@@ -4,16 +4,21 @@ Refactored API endpoints to use CrewAI-based workflow.
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
+import itertools
 import os
 import shutil
 import logging
+from urllib.parse import quote
 
 from crew.crew import job_application_crew
 from agents.job_fetcher_agent import job_fetcher_agent
 from agents.application_agent import application_agent
 from services.utils import save_json_file, sanitize_filename
+from services.pdf_export_service import pdf_export_service
 
 # Get logger (don't configure at module level)
 logger = logging.getLogger(__name__)
@@ -238,6 +243,42 @@ async def generate_letter(request: GenerateLetterRequest):
         raise HTTPException(status_code=500, detail="Error generating motivation letter")
 
 
+# Stream motivation letter endpoint
+@router.post("/generate-letter/stream")
+async def generate_letter_stream(request: GenerateLetterRequest):
+    """
+    Stream a personalized motivation letter as plain text while it is generated.
+    
+    Args:
+        request: Request with CV data, job ID, and optional custom message
+        
+    Returns:
+        Streaming plain-text response with the motivation letter
+    """
+    job_data = job_fetcher_agent.get_job_by_id(request.job_id)
+    
+    if not job_data:
+        raise HTTPException(status_code=404, detail=f"Job with ID {request.job_id} not found")
+    
+    letter_stream = job_application_crew.stream_cover_letter(
+        cv_data=request.cv_data,
+        job_data=job_data,
+        custom_message=request.custom_message
+    )
+    
+    # Wait for the first piece so a failing Groq call still returns a 500
+    try:
+        first_piece = await run_in_threadpool(next, letter_stream, "")
+    except Exception as e:
+        print(f"Error generating letter: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error generating motivation letter")
+    
+    return StreamingResponse(
+        itertools.chain([first_piece], letter_stream),
+        media_type="text/plain; charset=utf-8"
+    )
+
+
 # Apply to job endpoint
 @router.post("/apply")
 async def apply_to_job(request: ApplyRequest):
@@ -408,6 +449,65 @@ async def export_cover_letter_pdf(
         raise HTTPException(status_code=500, detail="Error exporting cover letter to PDF")
 
 
+# Render cover letter PDF in memory and return it inline
+@router.post("/export-pdf/inline")
+async def export_cover_letter_pdf_inline(
+    job_id: int,
+    cover_letter: str,
+    filename: Optional[str] = None
+):
+    """
+    Render a cover letter to PDF and return the document itself.
+    
+    Unlike /export-pdf, nothing is written to the exports directory.
+    
+    Args:
+        job_id: Job ID
+        cover_letter: Cover letter text
+        filename: Optional filename suggested to the browser
+        
+    Returns:
+        The PDF document (application/pdf)
+    """
+    try:
+        job_data = job_fetcher_agent.get_job_by_id(job_id)
+        
+        if not job_data:
+            raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+        
+        # ReportLab layout is CPU-bound; keep it off the event loop
+        pdf_bytes = await run_in_threadpool(pdf_export_service.export_to_bytes, cover_letter)
+        
+        if not filename:
+            company = job_data.get('company') or job_data.get('organization', 'Company')
+            filename = f"CoverLetter_{sanitize_filename(company)}"
+        if not filename.endswith('.pdf'):
+            filename += '.pdf'
+        
+        filename = f"{sanitize_filename(filename[:-4])}.pdf"
+        
+        # Headers are latin-1: send an ASCII fallback name, plus the UTF-8 name
+        # (RFC 5987) when it has other characters, as FileResponse does
+        ascii_filename = filename.encode('ascii', 'ignore').decode('ascii')
+        if ascii_filename.startswith('.'):
+            ascii_filename = 'CoverLetter' + ascii_filename
+        content_disposition = f'inline; filename="{ascii_filename}"'
+        if ascii_filename != filename:
+            content_disposition += f"; filename*=UTF-8''{quote(filename)}"
+        
+        return Response(
+            content=pdf_bytes,
+            media_type="application/pdf",
+            headers={"Content-Disposition": content_disposition}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error exporting to PDF: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error exporting cover letter to PDF")
+
+
 # Get skill match analysis endpoint
 @router.post("/skill-match")
 async def get_skill_match(cv_data: dict, job_id: int):
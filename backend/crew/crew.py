@@ -4,7 +4,7 @@ Orchestrates agents and tasks for the job application workflow.
 """
 
 from crewai import Crew, Process
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from crew.agents import (
     create_cv_analysis_agent,
     create_job_fetcher_agent,
@@ -25,7 +25,7 @@ from crew.tasks import (
 from agents.cv_analysis_agent import cv_analysis_agent as legacy_cv_agent
 from agents.job_fetcher_agent import job_fetcher_agent as legacy_job_agent
 from agents.matching_agent import matching_agent as legacy_matching_agent
-from services.email_service import email_service
+from services.email_service import get_email_service
 from services.utils import sanitize_filename
 
 # Import new Groq-powered services
@@ -165,6 +165,25 @@ class JobApplicationCrew:
             else:
                 return str(result)
     
+    def stream_cover_letter(self, cv_data: Dict, job_data: Dict,
+                            custom_message: str = "") -> Iterator[str]:
+        """
+        Stream a cover letter from Groq as it is generated.
+        
+        Args:
+            cv_data: Parsed CV data
+            job_data: Job offer data
+            custom_message: Optional custom message
+            
+        Returns:
+            Iterator over pieces of the cover letter text
+        """
+        return groq_cover_letter_service.generate_cover_letter_stream(
+            cv_data=cv_data,
+            job_data=job_data,
+            custom_message=custom_message
+        )
+    
     def submit_application(self, cv_data: Dict, job_data: Dict, 
                           motivation_letter: str) -> Dict:
         """
@@ -210,7 +229,7 @@ class JobApplicationCrew:
         cv_path = cv_data.get('temp_cv_path', None)
         
         # Send the email using email service with attachments
-        result = email_service.send_job_application(
+        result = get_email_service().send_job_application(
             recipient_email=recipient_email,
             job_title=job_title,
             company=company,
@@ -1,18 +1,31 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from api.routes import router
 from api.oauth_routes import oauth_router
+from services.nlp_service import nlp_service
 
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the embedding model at startup instead of on the first request, if asked."""
+    if os.getenv('NLP_EAGER_LOAD', '').lower() in ('1', 'true', 'yes'):
+        nlp_service.warm_up()
+    yield
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Multi-Agent Job Application System (CrewAI)",
     description="AI-powered system for intelligent job discovery and application automation using CrewAI",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
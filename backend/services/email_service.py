@@ -1,37 +1,136 @@
+import asyncio
+import base64
+import contextlib
+import functools
+import hashlib
+import io
 import smtplib
+import threading
+from collections import OrderedDict
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from typing import Optional, List
+from email.message import EmailMessage, MIMEPart
+from typing import BinaryIO, Optional, List, Tuple, Union
 import os
-from dotenv import load_dotenv
-import openai
-from openai import OpenAI
-from services.utils import get_mime_type
+import string
+import time
+from tenacity import retry, retry_if_exception, stop_after_delay, wait_exponential
+from services.utils import get_mime_type, run_sync
 
-load_dotenv()
+# Heavy dependencies (openai, dotenv, aiosmtplib) are imported on first use
+# so that importing this module stays cheap for processes that never send email.
 
 # Get logger (don't configure at module level)
 logger = logging.getLogger(__name__)
 
+# Escapes HTML special characters and converts line breaks to <br> in one pass
+_HTML_BODY_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '\n': '<br>'})
+
+# Escapes HTML special characters only, for text shown with white-space: pre-wrap
+_HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# MIME types for the attachments this service actually sends (CVs and letters)
+_FAST_MIME = {
+    '.pdf': ('application', 'pdf'),
+    '.docx': ('application', 'vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    '.doc': ('application', 'msword'),
+    '.txt': ('text', 'plain'),
+}
+
+
+# An attachment is either a file path, or a (filename, content) pair whose content
+# is bytes or an open binary file that the caller has already validated.
+Attachment = Union[str, Tuple[str, Union[bytes, BinaryIO]]]
+
+
+def _attachment_name(attachment: Attachment) -> str:
+    """Return the filename an attachment is sent under."""
+    if isinstance(attachment, tuple):
+        return attachment[0]
+    return os.path.basename(attachment)
+
+
+# Attachments are base64-encoded in chunks of whole 76-character lines (57 raw
+# bytes per line)
+_ATTACHMENT_CHUNK_SIZE = 57 * 1024
+
+
+def _attachment_mime_type(file_path: str) -> tuple:
+    """Return (main_type, sub_type) for an attachment path."""
+    fast = _FAST_MIME.get(os.path.splitext(file_path)[1].lower())
+    if fast:
+        return fast
+    mime_type = get_mime_type(file_path)
+    if '/' in mime_type:
+        return tuple(mime_type.split('/', 1))
+    # Fallback to octet-stream if invalid MIME type
+    return 'application', 'octet-stream'
+
+
+def _load_dotenv_once():
+    """Load the .env file once per process."""
+    if not os.environ.get('_DOTENV_LOADED'):
+        from dotenv import load_dotenv
+        load_dotenv()
+        os.environ['_DOTENV_LOADED'] = '1'
+
+
+def _is_transient_openai_error(exc: BaseException) -> bool:
+    """Whether an OpenAI error is worth retrying (rate limit, timeout, connection)."""
+    import openai
+    return isinstance(exc, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError))
+
+
+# Retry transient OpenAI failures briefly before falling back to the templates.
+# The async client is created with max_retries=0 so retries don't multiply
+# with the SDK's own.
+_openai_retry = retry(
+    reraise=True,
+    retry=retry_if_exception(_is_transient_openai_error),
+    stop=stop_after_delay(4),
+    wait=wait_exponential(multiplier=0.2, max=1.5)
+)
+
+
 class EmailService:
+    # Fallback subject template
+    _SUBJECT_TMPL = string.Template("Candidature de $applicant_name pour le poste de $job_title - $company")
+    
+    # Static instructions for AI email bodies. Kept in the system message so the
+    # prompt prefix is identical across requests and eligible for prompt caching.
+    _BODY_SYSTEM_PROMPT = (
+        "Tu rediges des emails de candidature en francais. A partir des champs fournis, "
+        "ecris uniquement le corps de l'email (pas de sujet), 8-10 lignes maximum, ton "
+        "professionnel mais chaleureux:\n"
+        "1. Salutation: Madame, Monsieur,\n"
+        "2. Introduction (1-2 phrases) annoncant la candidature au poste\n"
+        "3. Mention des pieces jointes (CV + lettre de motivation)\n"
+        "4. Demande d'entretien\n"
+        "5. Formule de politesse: Cordialement,\n"
+        "6. Signature: nom, email, telephone (si fourni)"
+    )
+    
     # Email body template constant
-    EMAIL_BODY_TEMPLATE = """Madame, Monsieur,
+    EMAIL_BODY_TEMPLATE = string.Template("""Madame, Monsieur,
 
-Je vous adresse ma candidature pour le poste de {job_title} au sein de {company}.
+Je vous adresse ma candidature pour le poste de $job_title au sein de $company.
 
 Vous trouverez ci-joint mon CV ainsi que ma lettre de motivation détaillant mon parcours et mes motivations pour ce poste.
 
 Je reste à votre disposition pour un entretien afin de discuter de ma candidature.
 
 Cordialement,
-{applicant_name}
-{applicant_email}
-{applicant_phone}"""
+$applicant_name
+$applicant_email
+$applicant_phone""")
+    
+    # Maximum number of rendered application HTML emails kept in memory
+    HTML_CACHE_SIZE = 256
+    
+    # Seconds a Gmail connection status lookup is reused across sends
+    GMAIL_STATUS_TTL = 30
     
     def __init__(self):
+        _load_dotenv_once()
         self.smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
         self.smtp_port = int(os.getenv('SMTP_PORT', '587'))
         self.sender_email = os.getenv('SENDER_EMAIL', '')
@@ -39,31 +138,186 @@ Cordialement,
         
         # Import Gmail service lazily to avoid circular imports
         self._google_oauth_service = None
+        self._gmail_status_cache = None  # (monotonic timestamp, status dict)
+        
+        # OpenAI clients for email content generation are created on first AI call
+        self._openai_api_key = os.getenv('OPENAI_API_KEY')
+        self.model = os.getenv('MODEL_NAME', 'gpt-4o-mini') if self._openai_api_key else None
         
-        # Initialize OpenAI client for email content generation
-        api_key = os.getenv('OPENAI_API_KEY')
-        if api_key:
-            self.openai_client = OpenAI(api_key=api_key)
-            self.model = os.getenv('MODEL_NAME', 'gpt-4o-mini')
-        else:
-            self.openai_client = None
-            self.model = None
+        # Rendered application HTML keyed by (body digest, job, company, attribution)
+        self._html_cache = OrderedDict()
+        self._html_cache_lock = threading.Lock()
+    
+    @functools.cached_property
+    def openai_client(self):
+        """Sync OpenAI client, instantiated on first use (None without API key)."""
+        if not self._openai_api_key:
+            return None
+        from openai import OpenAI
+        return OpenAI(api_key=self._openai_api_key)
+    
+    @contextlib.asynccontextmanager
+    async def _async_openai_session(self):
+        """
+        Async context manager yielding an AsyncOpenAI client (None without API key).
+        
+        The client's connection pool is bound to the running event loop, and
+        sends run on short-lived loops (see send_job_application), so a client
+        is opened per application and closed when it is done.
+        """
+        if not self._openai_api_key:
+            yield None
+            return
+        from openai import AsyncOpenAI
+        # _openai_retry is the only retry layer for these calls
+        async with AsyncOpenAI(api_key=self._openai_api_key, max_retries=0) as client:
+            yield client
     
     @property
     def google_oauth_service(self):
         """Lazy load Google OAuth service to avoid circular imports."""
         if self._google_oauth_service is None:
-            from services.google_oauth_service import google_oauth_service
-            self._google_oauth_service = google_oauth_service
+            from services.google_oauth_service import get_google_oauth_service
+            self._google_oauth_service = get_google_oauth_service()
         return self._google_oauth_service
     
+    def _cached_gmail_status(self) -> Optional[dict]:
+        """Return the cached Gmail connection status if it is still fresh."""
+        cached = self._gmail_status_cache
+        if cached and time.monotonic() - cached[0] < self.GMAIL_STATUS_TTL:
+            return cached[1]
+        return None
+    
+    def _get_gmail_status(self) -> dict:
+        """Get the Gmail connection status, cached for GMAIL_STATUS_TTL seconds."""
+        status = self._cached_gmail_status()
+        if status is None:
+            status = self.google_oauth_service.get_connection_status()
+            self._gmail_status_cache = (time.monotonic(), status)
+        return status
+    
+    def _simulate_send(
+        self,
+        recipient_email: str,
+        subject: str,
+        body: str,
+        attachments: Optional[List[Attachment]] = None
+    ) -> dict:
+        """Build the result returned when SMTP credentials are not set."""
+        attachment_info = ""
+        attachment_names = []
+        if attachments:
+            attachment_names = [_attachment_name(a) for a in attachments]
+            attachment_info = f", Attachments: {', '.join(attachment_names)}"
+        
+        # Slice once; only append the ellipsis when the body was truncated
+        preview = body[:100]
+        if len(preview) < len(body):
+            preview += '...'
+        
+        return {
+            'success': True,
+            'message': f'Email simulated (no credentials set). Would send to: {recipient_email}{attachment_info}',
+            'details': {
+                'to': recipient_email,
+                'subject': subject,
+                'preview': preview,
+                'attachments': attachment_names
+            }
+        }
+    
+    def _build_message(
+        self,
+        recipient_email: str,
+        subject: str,
+        body: str,
+        html_body: Optional[str] = None,
+        attachments: Optional[List[Attachment]] = None
+    ):
+        """
+        Build the MIME message sent over SMTP.
+        
+        Args:
+            recipient_email: Email address of the recipient
+            subject: Email subject
+            body: Plain text email body
+            html_body: Optional HTML email body
+            attachments: Optional list of file paths or (filename, content) pairs to attach
+            
+        Returns:
+            MIME message ready to be sent
+        """
+        # EmailMessage picks the lightest structure for the content: a bare
+        # text/plain message, multipart/alternative when there is an HTML body,
+        # and multipart/mixed (wrapping the alternative part) with attachments.
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = self.sender_email
+        message['To'] = recipient_email
+        message.set_content(body)
+        
+        # Add HTML part if provided
+        if html_body:
+            message.add_alternative(html_body, subtype='html')
+        
+        # Add attachments if provided
+        if attachments:
+            for attachment in attachments:
+                # Pre-opened attachments were validated by the caller
+                if isinstance(attachment, tuple) or os.path.exists(attachment):
+                    try:
+                        self._stream_attachment_to_message(message, attachment)
+                    except (OSError, IOError) as e:
+                        logger.error(f"Error attaching file {_attachment_name(attachment)}: {str(e)}")
+        
+        return message
+    
+    def _stream_attachment_to_message(self, message: EmailMessage, attachment: Attachment):
+        """
+        Attach a file to a message, base64-encoding it chunk by chunk so only
+        one raw chunk is held in memory alongside the encoded text.
+        
+        Args:
+            message: Message to attach the file to
+            attachment: File path or (filename, content) pair to attach
+        """
+        filename = _attachment_name(attachment)
+        main_type, sub_type = _attachment_mime_type(filename)
+        
+        with contextlib.ExitStack() as stack:
+            if isinstance(attachment, tuple):
+                content = attachment[1]
+                if isinstance(content, bytes):
+                    source = io.BytesIO(content)
+                else:
+                    # Rewind in case an earlier send attempt (e.g. Gmail) read it
+                    source = content
+                    source.seek(0)
+            else:
+                source = stack.enter_context(open(attachment, 'rb'))
+            
+            encoded_lines = []
+            while chunk := source.read(_ATTACHMENT_CHUNK_SIZE):
+                encoded_lines.append(base64.encodebytes(chunk).decode('ascii'))
+            encoded = ''.join(encoded_lines)
+        
+        part = MIMEPart()
+        part['Content-Type'] = f'{main_type}/{sub_type}'
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        part.set_payload(encoded)
+        
+        if message.get_content_type() != 'multipart/mixed':
+            message.make_mixed()
+        message.attach(part)
+    
     def send_email(
         self,
         recipient_email: str,
         subject: str,
         body: str,
         html_body: Optional[str] = None,
-        attachments: Optional[List[str]] = None
+        attachments: Optional[List[Attachment]] = None
     ) -> dict:
         """
         Send an email to a recipient.
@@ -74,14 +328,14 @@ Cordialement,
             subject: Email subject
             body: Plain text email body
             html_body: Optional HTML email body
-            attachments: Optional list of file paths to attach
+            attachments: Optional list of file paths or (filename, content) pairs to attach
             
         Returns:
             Dictionary with success status and message
         """
         try:
             # Try Gmail API first if connected
-            gmail_status = self.google_oauth_service.get_connection_status()
+            gmail_status = self._get_gmail_status()
             if gmail_status.get('connected'):
                 result = self.google_oauth_service.send_email_via_gmail(
                     recipient_email=recipient_email,
@@ -91,66 +345,19 @@ Cordialement,
                 )
                 if result.get('success'):
                     return result
-                # If Gmail API fails, fall through to SMTP
-                print(f"Gmail API failed, falling back to SMTP: {result.get('message')}")
+                # If Gmail API fails, re-check the connection next time and fall through to SMTP
+                self._gmail_status_cache = None
+                logger.warning(
+                    "Gmail API failed, falling back to SMTP: %s",
+                    result.get('message'),
+                    extra={'recipient': recipient_email, 'stage': 'gmail_fallback'}
+                )
             
             # For demo purposes, if credentials are not set, simulate sending
-            if not self.sender_email or not self.sender_password:
-                attachment_info = ""
-                attachment_names = []
-                if attachments:
-                    attachment_names = [os.path.basename(f) for f in attachments]
-                    attachment_info = f", Attachments: {', '.join(attachment_names)}"
-                return {
-                    'success': True,
-                    'message': f'Email simulated (no credentials set). Would send to: {recipient_email}{attachment_info}',
-                    'details': {
-                        'to': recipient_email,
-                        'subject': subject,
-                        'preview': body[:100] + '...' if len(body) > 100 else body,
-                        'attachments': attachment_names
-                    }
-                }
-            
-            # Create message
-            message = MIMEMultipart('alternative')
-            message['Subject'] = subject
-            message['From'] = self.sender_email
-            message['To'] = recipient_email
-            
-            # Add plain text part
-            part1 = MIMEText(body, 'plain')
-            message.attach(part1)
+            if not (self.sender_email and self.sender_password):
+                return self._simulate_send(recipient_email, subject, body, attachments)
             
-            # Add HTML part if provided
-            if html_body:
-                part2 = MIMEText(html_body, 'html')
-                message.attach(part2)
-            
-            # Add attachments if provided
-            if attachments:
-                for file_path in attachments:
-                    if os.path.exists(file_path):
-                        try:
-                            # Get MIME type dynamically
-                            mime_type = get_mime_type(file_path)
-                            if '/' in mime_type:
-                                main_type, sub_type = mime_type.split('/', 1)
-                            else:
-                                # Fallback to octet-stream if invalid MIME type
-                                main_type, sub_type = 'application', 'octet-stream'
-                            
-                            with open(file_path, 'rb') as f:
-                                part = MIMEBase(main_type, sub_type)
-                                part.set_payload(f.read())
-                                encoders.encode_base64(part)
-                                part.add_header(
-                                    'Content-Disposition',
-                                    f'attachment; filename={os.path.basename(file_path)}'
-                                )
-                                message.attach(part)
-                        except (OSError, IOError) as e:
-                            logger.error(f"Error attaching file {file_path}: {str(e)}")
+            message = self._build_message(recipient_email, subject, body, html_body, attachments)
             
             # Send email
             with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
@@ -176,8 +383,103 @@ Cordialement,
                 'message': 'Failed to send email. Please check your email configuration.'
             }
     
-    def _generate_ai_subject(
+    async def _asend_via_smtp(self, message) -> None:
+        """
+        Send a message with aiosmtplib over a connection opened for this send.
+        
+        Sends run on short-lived event loops (see send_job_application), so a
+        connection cannot outlive the loop that opened it; the context manager
+        QUITs and closes it whether or not sending succeeds.
+        
+        Args:
+            message: MIME message to send
+        """
+        import aiosmtplib
+        
+        async with aiosmtplib.SMTP(
+            hostname=self.smtp_server,
+            port=self.smtp_port,
+            start_tls=True
+        ) as smtp:
+            await smtp.login(self.sender_email, self.sender_password)
+            await smtp.send_message(message)
+    
+    async def asend_email(
+        self,
+        recipient_email: str,
+        subject: str,
+        body: str,
+        html_body: Optional[str] = None,
+        attachments: Optional[List[Attachment]] = None
+    ) -> dict:
+        """
+        Async version of send_email using aiosmtplib for the SMTP path.
+        
+        Args:
+            recipient_email: Email address of the recipient
+            subject: Email subject
+            body: Plain text email body
+            html_body: Optional HTML email body
+            attachments: Optional list of file paths or (filename, content) pairs to attach
+            
+        Returns:
+            Dictionary with success status and message
+        """
+        import aiosmtplib
+        
+        loop = asyncio.get_running_loop()
+        try:
+            # Try Gmail API first if connected (the Google client is blocking)
+            gmail_status = (
+                self._cached_gmail_status()
+                or await loop.run_in_executor(None, self._get_gmail_status)
+            )
+            if gmail_status.get('connected'):
+                result = await loop.run_in_executor(None, functools.partial(
+                    self.google_oauth_service.send_email_via_gmail,
+                    recipient_email=recipient_email,
+                    subject=subject,
+                    body=html_body if html_body else body,
+                    attachments=attachments
+                ))
+                if result.get('success'):
+                    return result
+                # If Gmail API fails, re-check the connection next time and fall through to SMTP
+                self._gmail_status_cache = None
+                logger.warning(
+                    "Gmail API failed, falling back to SMTP: %s",
+                    result.get('message'),
+                    extra={'recipient': recipient_email, 'stage': 'gmail_fallback'}
+                )
+            
+            # For demo purposes, if credentials are not set, simulate sending
+            if not (self.sender_email and self.sender_password):
+                return self._simulate_send(recipient_email, subject, body, attachments)
+            
+            message = self._build_message(recipient_email, subject, body, html_body, attachments)
+            await self._asend_via_smtp(message)
+            
+            return {
+                'success': True,
+                'message': f'Email sent successfully to {recipient_email}'
+            }
+            
+        except aiosmtplib.SMTPException as e:
+            logger.error(f"SMTP error sending email: {str(e)}")
+            return {
+                'success': False,
+                'message': 'Failed to send email. Please check your email configuration.'
+            }
+        except Exception as e:
+            logger.error(f"Unexpected error sending email: {str(e)}")
+            return {
+                'success': False,
+                'message': 'Failed to send email. Please check your email configuration.'
+            }
+    
+    async def _agenerate_ai_subject(
         self,
+        client,
         job_title: str,
         company: str,
         applicant_name: str
@@ -186,6 +488,7 @@ Cordialement,
         Generate a professional, personalized email subject using AI.
         
         Args:
+            client: AsyncOpenAI client, or None to use the template
             job_title: Title of the job position
             company: Company name
             applicant_name: Name of the applicant
@@ -193,51 +496,53 @@ Cordialement,
         Returns:
             Generated subject line
         """
-        if not self.openai_client:
+        if not client:
             # Fallback to template if OpenAI not available
-            return f"Candidature de {applicant_name} pour le poste de {job_title} - {company}"
+            return self._fallback_subject(job_title, company, applicant_name)
+        
+        import openai
         
         try:
-            prompt = f"""Generate a professional French email subject line for a job application.
-
-Job Title: {job_title}
-Company: {company}
-Applicant Name: {applicant_name}
-
-Requirements:
-- Use the format: "Candidature de [Nom Prénom] pour le poste de [Titre] - [Entreprise]"
-- Keep it professional and concise
-- Return ONLY the subject line, no quotes or extra text
-
-Subject line:"""
-            
-            response = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional email subject line generator. Generate only the subject line, nothing else."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=100
+            prompt = (
+                f"Sujet d'email FR: Candidature de {applicant_name} pour le poste de "
+                f"{job_title} - {company}. Renvoie seulement le sujet."
             )
             
-            subject = response.choices[0].message.content.strip()
+            subject = (await self._openai_subject_call(client, prompt)).strip()
             # Remove quotes if present
             subject = subject.strip('"').strip("'")
             return subject
             
         except openai.OpenAIError as e:
             logger.warning(f"OpenAI error generating subject: {str(e)}")
-            return f"Candidature de {applicant_name} pour le poste de {job_title} - {company}"
+            return self._fallback_subject(job_title, company, applicant_name)
         except Exception as e:
             logger.error(f"Unexpected error generating AI subject: {str(e)}")
-            return f"Candidature de {applicant_name} pour le poste de {job_title} - {company}"
+            return self._fallback_subject(job_title, company, applicant_name)
+    
+    @_openai_retry
+    async def _openai_subject_call(self, client, prompt: str) -> str:
+        """Request a subject line from OpenAI, retrying transient errors."""
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.3,
+            max_tokens=40
+        )
+        return response.choices[0].message.content
+    
+    def _fallback_subject(self, job_title: str, company: str, applicant_name: str) -> str:
+        """Generate fallback subject line using template."""
+        return self._SUBJECT_TMPL.substitute(
+            applicant_name=applicant_name,
+            job_title=job_title,
+            company=company
+        )
     
     def _generate_fallback_email_body(
         self,
@@ -248,7 +553,7 @@ Subject line:"""
         applicant_phone: str
     ) -> str:
         """Generate fallback email body using template."""
-        return self.EMAIL_BODY_TEMPLATE.format(
+        return self.EMAIL_BODY_TEMPLATE.substitute(
             job_title=job_title,
             company=company,
             applicant_name=applicant_name,
@@ -256,8 +561,9 @@ Subject line:"""
             applicant_phone=applicant_phone if applicant_phone else ''
         )
     
-    def _generate_ai_email_body(
+    async def _agenerate_ai_email_body(
         self,
+        client,
         job_title: str,
         company: str,
         applicant_name: str,
@@ -268,6 +574,7 @@ Subject line:"""
         Generate a professional French email body using AI.
         
         Args:
+            client: AsyncOpenAI client, or None to use the template
             job_title: Title of the job position
             company: Company name
             applicant_name: Name of the applicant
@@ -277,51 +584,24 @@ Subject line:"""
         Returns:
             Generated email body in French
         """
-        if not self.openai_client:
+        if not client:
             # Use template fallback
             return self._generate_fallback_email_body(
                 job_title, company, applicant_name, applicant_email, applicant_phone
             )
         
+        import openai
+        
         try:
-            prompt = f"""Generate a professional French email body for a job application.
-
-Job Title: {job_title}
-Company: {company}
-Applicant Name: {applicant_name}
-Applicant Email: {applicant_email}
-Applicant Phone: {applicant_phone if applicant_phone else 'Not provided'}
-
-Requirements:
-1. Professional greeting (Madame, Monsieur,)
-2. Brief introduction (1-2 sentences) stating the application for the position
-3. Reference to attached documents (CV + lettre de motivation)
-4. Call to action (request for interview/meeting)
-5. Professional closing (Cordialement,)
-6. Signature with name, email, and phone (if provided)
-7. Keep it concise (8-10 lines maximum)
-8. Professional but warm tone
-9. Return ONLY the email body, no subject line
-
-Email body:"""
-            
-            response = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional French email writer. Generate professional, concise job application emails in French."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.5,
-                max_tokens=400
+            prompt = (
+                f"Poste: {job_title}\n"
+                f"Entreprise: {company}\n"
+                f"Nom: {applicant_name}\n"
+                f"Email: {applicant_email}\n"
+                f"Telephone: {applicant_phone if applicant_phone else 'non fourni'}"
             )
             
-            body = response.choices[0].message.content.strip()
+            body = (await self._openai_body_call(client, prompt)).strip()
             return body
             
         except openai.OpenAIError as e:
@@ -335,6 +615,26 @@ Email body:"""
                 job_title, company, applicant_name, applicant_email, applicant_phone
             )
     
+    @_openai_retry
+    async def _openai_body_call(self, client, prompt: str) -> str:
+        """Request an email body from OpenAI, retrying transient errors."""
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": self._BODY_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.5,
+            max_tokens=300
+        )
+        return response.choices[0].message.content
+    
     def send_job_application(
         self,
         recipient_email: str,
@@ -352,6 +652,43 @@ Email body:"""
         """
         Send a job application email with AI-generated content and PDF attachments.
         
+        Synchronous wrapper around asend_job_application for existing callers.
+        
+        Returns:
+            Dictionary with success status and message
+        """
+        return run_sync(self.asend_job_application(
+            recipient_email=recipient_email,
+            job_title=job_title,
+            company=company,
+            applicant_name=applicant_name,
+            motivation_letter=motivation_letter,
+            cv_text=cv_text,
+            include_ai_attribution=include_ai_attribution,
+            applicant_email=applicant_email,
+            applicant_phone=applicant_phone,
+            cv_path=cv_path,
+            motivation_letter_path=motivation_letter_path
+        ))
+    
+    async def asend_job_application(
+        self,
+        recipient_email: str,
+        job_title: str,
+        company: str,
+        applicant_name: str,
+        motivation_letter: str,
+        cv_text: Optional[str] = None,
+        include_ai_attribution: bool = False,
+        applicant_email: str = "",
+        applicant_phone: str = "",
+        cv_path: Optional[str] = None,
+        motivation_letter_path: Optional[str] = None
+    ) -> dict:
+        """
+        Send a job application email with AI-generated content and PDF attachments.
+        The AI subject and body are requested from OpenAI concurrently.
+        
         Args:
             recipient_email: Email of the hiring manager/HR
             job_title: Title of the job position
@@ -368,57 +705,124 @@ Email body:"""
         Returns:
             Dictionary with success status and message
         """
-        # Generate AI-powered subject line
-        subject = self._generate_ai_subject(job_title, company, applicant_name)
-        
-        # Generate AI-powered email body in French
-        body = self._generate_ai_email_body(
-            job_title, company, applicant_name, applicant_email, applicant_phone
-        )
-        
-        # Prepare attachments list with validation
-        attachments = []
+        # Generate AI-powered subject line and French email body concurrently
+        async with self._async_openai_session() as client:
+            subject, body = await asyncio.gather(
+                self._agenerate_ai_subject(client, job_title, company, applicant_name),
+                self._agenerate_ai_email_body(
+                    client, job_title, company, applicant_name, applicant_email, applicant_phone
+                )
+            )
         
-        # Validate CV attachment
-        if cv_path:
-            if os.path.exists(cv_path):
-                if os.path.isfile(cv_path) and os.access(cv_path, os.R_OK):
-                    attachments.append(cv_path)
-                    logger.info(f"CV file attached: {os.path.basename(cv_path)}")
-                else:
-                    logger.warning(f"CV file exists but is not readable: {cv_path}")
-            else:
-                logger.warning(f"CV file not found: {cv_path}")
-        else:
-            logger.warning("No CV path provided for job application")
-        
-        # Validate motivation letter attachment
-        if motivation_letter_path:
-            if os.path.exists(motivation_letter_path):
-                if os.path.isfile(motivation_letter_path) and os.access(motivation_letter_path, os.R_OK):
-                    attachments.append(motivation_letter_path)
-                    logger.info(f"Motivation letter attached: {os.path.basename(motivation_letter_path)}")
-                else:
-                    logger.warning(f"Motivation letter exists but is not readable: {motivation_letter_path}")
+        with contextlib.ExitStack() as stack:
+            # Open attachments once; the handles are passed down so the send
+            # path does not re-check the files
+            attachments = []
+            
+            # Validate CV attachment
+            if cv_path:
+                cv_attachment = self._open_attachment(stack, cv_path, "CV file")
+                if cv_attachment:
+                    attachments.append(cv_attachment)
             else:
-                logger.warning(f"Motivation letter not found: {motivation_letter_path}")
+                logger.warning("No CV path provided for job application")
+            
+            # Validate motivation letter attachment
+            if motivation_letter_path:
+                letter_attachment = self._open_attachment(stack, motivation_letter_path, "Motivation letter")
+                if letter_attachment:
+                    attachments.append(letter_attachment)
+            
+            # Verify we have at least one attachment
+            if not attachments:
+                logger.error("No valid attachments found for job application")
+                return {
+                    'success': False,
+                    'message': 'Cannot send application: No valid attachments found (CV or motivation letter)'
+                }
+            
+            # Generate HTML version for better formatting
+            html_body = self._generate_html_email_for_application(
+                body, job_title, company, include_ai_attribution
+            )
+            
+            return await self.asend_email(recipient_email, subject, body, html_body, attachments)
+    
+    def _open_attachment(
+        self,
+        stack: contextlib.ExitStack,
+        path: str,
+        label: str
+    ) -> Optional[Tuple[str, BinaryIO]]:
+        """
+        Open an attachment for reading, registering the handle on the stack.
         
-        # Verify we have at least one attachment
-        if not attachments:
-            logger.error("No valid attachments found for job application")
-            return {
-                'success': False,
-                'message': 'Cannot send application: No valid attachments found (CV or motivation letter)'
-            }
+        Args:
+            stack: ExitStack that closes the handle once the email is sent
+            path: Path of the file to attach
+            label: Human-readable name of the document, for logging
+            
+        Returns:
+            (filename, binary file object) pair, or None if the file cannot be read
+        """
+        if not os.path.isfile(path):
+            logger.warning(f"{label} not found: {path}")
+            return None
+        try:
+            handle = stack.enter_context(open(path, 'rb'))
+        except OSError:
+            logger.warning(f"{label} exists but is not readable: {path}")
+            return None
+        logger.info(f"{label} attached: {os.path.basename(path)}")
+        return os.path.basename(path), handle
+    
+    def clear_html_cache(self):
+        """Drop all cached application HTML emails."""
+        with self._html_cache_lock:
+            self._html_cache.clear()
+    
+    def _generate_html_email_for_application(
+        self,
+        body: str,
+        job_title: str,
+        company: str,
+        include_ai_attribution: bool
+    ) -> str:
+        """
+        Generate simple HTML email for application, reusing a cached render
+        when the same body is sent for the same job.
         
-        # Generate HTML version for better formatting
-        html_body = self._generate_html_email_for_application(
-            body, job_title, company, include_ai_attribution
+        Args:
+            body: Plain text email body
+            job_title: Job title
+            company: Company name
+            include_ai_attribution: Whether to include AI attribution
+            
+        Returns:
+            HTML email body
+        """
+        key = (
+            hashlib.blake2b(body.encode('utf-8'), digest_size=16).digest(),
+            job_title,
+            company,
+            include_ai_attribution
         )
+        with self._html_cache_lock:
+            html_body = self._html_cache.get(key)
+            if html_body is not None:
+                self._html_cache.move_to_end(key)
+                return html_body
         
-        return self.send_email(recipient_email, subject, body, html_body, attachments)
+        html_body = self._render_html_email_for_application(
+            body, job_title, company, include_ai_attribution
+        )
+        with self._html_cache_lock:
+            self._html_cache[key] = html_body
+            if len(self._html_cache) > self.HTML_CACHE_SIZE:
+                self._html_cache.popitem(last=False)
+        return html_body
     
-    def _generate_html_email_for_application(
+    def _render_html_email_for_application(
         self,
         body: str,
         job_title: str,
@@ -426,7 +830,7 @@ Email body:"""
         include_ai_attribution: bool
     ) -> str:
         """
-        Generate simple HTML email for application.
+        Render simple HTML email for application.
         
         Args:
             body: Plain text email body
@@ -441,8 +845,8 @@ Email body:"""
         if include_ai_attribution:
             footer_content = "<p style='font-size: 11px; color: #999;'>Cette candidature a été générée avec un système d'IA.</p>"
         
-        # Convert line breaks to <br> tags
-        html_content = body.replace('\n\n', '<br><br>').replace('\n', '<br>')
+        # Escape HTML and convert line breaks to <br> tags
+        html_content = body.translate(_HTML_BODY_TABLE)
         
         html_body = f"""
         <html>
@@ -651,7 +1055,7 @@ Best regards,
                     <p style="color: #666; margin: 5px 0 0 0;">{company}</p>
                 </div>
                 <p>Dear Hiring Manager,</p>
-                <div class="content">{motivation_letter}</div>
+                <div class="content">{motivation_letter.translate(_HTML_ESCAPE_TABLE)}</div>
                 <div class="signature">
                     <p>Best regards,<br>{applicant_name}</p>
                 </div>
@@ -661,5 +1065,14 @@ Best regards,
         """
         return html_body
 
-# Singleton instance
-email_service = EmailService()
+@functools.lru_cache(maxsize=1)
+def get_email_service() -> EmailService:
+    """Get or create the email service singleton."""
+    return EmailService()
+
+
+def __getattr__(name):
+    # For backward compatibility: `from services.email_service import email_service`
+    if name == 'email_service':
+        return get_email_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,22 +4,38 @@ Handles OAuth flow and Gmail API authentication.
 """
 
 import os
-import json
 import base64
 import logging
-from typing import Optional, Dict, List
+import threading
+from typing import TYPE_CHECKING, BinaryIO, Optional, Dict, List, Tuple, Union
 from datetime import datetime, timedelta
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
+from email.header import Header
 from dotenv import load_dotenv
 from services.utils import get_mime_type
 
+# The google client libraries are heavy to import; they are loaded on first use
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import Flow
+
+try:
+    import orjson
+    
+    _dumps_json = orjson.dumps
+    _loads_json = orjson.loads
+except ImportError:
+    # Fall back to the stdlib encoder if orjson is not installed
+    import json
+    
+    def _dumps_json(data: Dict) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+    
+    _loads_json = json.loads
+
 load_dotenv()
 
 # Configure logging
@@ -29,8 +45,24 @@ logging.basicConfig(level=logging.INFO)
 class GoogleOAuthService:
     """Service for managing Google OAuth and Gmail API."""
     
-    # Gmail API scopes
-    SCOPES = ['https://www.googleapis.com/auth/gmail.send']
+    __slots__ = (
+        'client_id',
+        'client_secret',
+        'redirect_uri',
+        '_client_config_value',
+        '_creds_cache',
+        '_gmail_sessions',
+    )
+    
+    # Gmail API scopes; openid + email make Google return the address in the id_token
+    SCOPES = [
+        'https://www.googleapis.com/auth/gmail.send',
+        'openid',
+        'https://www.googleapis.com/auth/userinfo.email'
+    ]
+    
+    # Gmail REST endpoint for sending a raw RFC 2822 message
+    GMAIL_SEND_URL = 'https://gmail.googleapis.com/gmail/v1/users/me/messages/send'
     
     # Storage file for credentials
     CREDENTIALS_FILE = os.path.join(
@@ -39,12 +71,49 @@ class GoogleOAuthService:
         'gmail_credentials.json'
     )
     
+    # Cached credentials this close to expiry are reloaded so refresh still happens
+    CREDENTIALS_EXPIRY_MARGIN = timedelta(seconds=60)
+    
     def __init__(self):
         """Initialize the Google OAuth service."""
         self.client_id = os.getenv('GOOGLE_CLIENT_ID', '')
         self.client_secret = os.getenv('GOOGLE_CLIENT_SECRET', '')
         self.redirect_uri = os.getenv('GOOGLE_REDIRECT_URI', 'http://localhost:8000/auth/google/callback')
+        self._client_config_value: Optional[Dict] = None
         
+        # (file mtime_ns, Credentials) of the last credentials file load
+        self._creds_cache: Optional[Tuple[int, 'Credentials']] = None
+        
+        # Authorized sessions are reused across sends so the connection stays
+        # open; requests sessions are not thread-safe, so each worker thread
+        # keeps its own
+        self._gmail_sessions = threading.local()
+    
+    @property
+    def _client_config(self) -> Dict:
+        """OAuth client configuration shared by every Flow, built on first use."""
+        if self._client_config_value is None:
+            self._client_config_value = {
+                "web": {
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+                    "token_uri": "https://oauth2.googleapis.com/token",
+                    "redirect_uris": [self.redirect_uri]
+                }
+            }
+        return self._client_config_value
+        
+    def _make_flow(self) -> 'Flow':
+        """Create an OAuth flow from the cached client configuration."""
+        from google_auth_oauthlib.flow import Flow
+        
+        return Flow.from_client_config(
+            client_config=self._client_config,
+            scopes=self.SCOPES,
+            redirect_uri=self.redirect_uri
+        )
+    
     def get_authorization_url(self) -> Optional[str]:
         """
         Generate the Google OAuth authorization URL.
@@ -57,19 +126,7 @@ class GoogleOAuthService:
             
         try:
             # Create flow instance
-            flow = Flow.from_client_config(
-                client_config={
-                    "web": {
-                        "client_id": self.client_id,
-                        "client_secret": self.client_secret,
-                        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                        "token_uri": "https://oauth2.googleapis.com/token",
-                        "redirect_uris": [self.redirect_uri]
-                    }
-                },
-                scopes=self.SCOPES,
-                redirect_uri=self.redirect_uri
-            )
+            flow = self._make_flow()
             
             # Generate authorization URL
             auth_url, _ = flow.authorization_url(
@@ -102,32 +159,24 @@ class GoogleOAuthService:
             
         try:
             # Create flow instance
-            flow = Flow.from_client_config(
-                client_config={
-                    "web": {
-                        "client_id": self.client_id,
-                        "client_secret": self.client_secret,
-                        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                        "token_uri": "https://oauth2.googleapis.com/token",
-                        "redirect_uris": [self.redirect_uri]
-                    }
-                },
-                scopes=self.SCOPES,
-                redirect_uri=self.redirect_uri
-            )
+            flow = self._make_flow()
             
             # Exchange code for credentials
             flow.fetch_token(code=code)
             credentials = flow.credentials
             
-            # Get user email from Gmail API
-            try:
-                service = build('gmail', 'v1', credentials=credentials)
-                profile = service.users().getProfile(userId='me').execute()
-                user_email = profile.get('emailAddress', '')
-            except Exception as e:
-                logging.warning(f"Error fetching user profile: {str(e)}")
-                user_email = ''
+            # Get user email from the id_token, or from Gmail API if absent
+            user_email = self._email_from_id_token(credentials)
+            if not user_email:
+                try:
+                    from googleapiclient.discovery import build
+                    
+                    service = build('gmail', 'v1', credentials=credentials, cache_discovery=False)
+                    profile = service.users().getProfile(userId='me').execute()
+                    user_email = profile.get('emailAddress', '')
+                except Exception as e:
+                    logging.warning(f"Error fetching user profile: {str(e)}")
+                    user_email = ''
             
             # Save credentials
             self._save_credentials(credentials, user_email)
@@ -145,7 +194,32 @@ class GoogleOAuthService:
                 'message': 'Failed to connect Gmail account'
             }
     
-    def _save_credentials(self, credentials: Credentials, user_email: str):
+    def _email_from_id_token(self, credentials: 'Credentials') -> str:
+        """
+        Read the email claim from the id_token returned with the access token.
+        
+        The token comes straight from Google's token endpoint over TLS, so its
+        signature is not re-verified (OpenID Connect Core, section 3.1.3.7).
+        
+        Args:
+            credentials: Credentials returned by the token exchange
+            
+        Returns:
+            Email address, or '' if no id_token or email claim is available
+        """
+        token = getattr(credentials, 'id_token', None)
+        if not token:
+            return ''
+        try:
+            from google.auth import jwt
+            
+            claims = jwt.decode(token, verify=False)
+            return claims.get('email', '')
+        except Exception as e:
+            logging.warning(f"Error decoding id_token: {str(e)}")
+            return ''
+    
+    def _save_credentials(self, credentials: 'Credentials', user_email: str):
         """
         Save credentials to file with secure permissions.
         
@@ -171,17 +245,19 @@ class GoogleOAuthService:
             }
             
             # Save to file with secure permissions
-            with open(self.CREDENTIALS_FILE, 'w') as f:
-                json.dump(creds_data, f, indent=2)
+            with open(self.CREDENTIALS_FILE, 'wb') as f:
+                f.write(_dumps_json(creds_data))
             
             # Set restrictive permissions (owner read/write only)
             os.chmod(self.CREDENTIALS_FILE, 0o600)
+            
+            self._creds_cache = None
                 
         except Exception as e:
             import logging
             logging.error(f"Error saving credentials: {str(e)}")
     
-    def get_credentials(self) -> Optional[Credentials]:
+    def get_credentials(self) -> Optional['Credentials']:
         """
         Load saved credentials.
         
@@ -189,13 +265,24 @@ class GoogleOAuthService:
             Credentials object or None if not available
         """
         try:
-            if not os.path.exists(self.CREDENTIALS_FILE):
+            try:
+                mtime_ns = os.stat(self.CREDENTIALS_FILE).st_mtime_ns
+            except FileNotFoundError:
+                self._creds_cache = None
                 return None
+            
+            # Reuse the parsed credentials while the file is unchanged
+            if self._creds_cache and self._creds_cache[0] == mtime_ns:
+                cached = self._creds_cache[1]
+                if not cached.expiry or cached.expiry - datetime.utcnow() > self.CREDENTIALS_EXPIRY_MARGIN:
+                    return cached
                 
-            with open(self.CREDENTIALS_FILE, 'r') as f:
-                creds_data = json.load(f)
+            with open(self.CREDENTIALS_FILE, 'rb') as f:
+                creds_data = _loads_json(f.read())
             
             # Create credentials object
+            from google.oauth2.credentials import Credentials
+            
             credentials = Credentials(
                 token=creds_data.get('token'),
                 refresh_token=creds_data.get('refresh_token'),
@@ -209,6 +296,7 @@ class GoogleOAuthService:
             if creds_data.get('expiry'):
                 credentials.expiry = datetime.fromisoformat(creds_data['expiry'])
             
+            self._creds_cache = (mtime_ns, credentials)
             return credentials
             
         except Exception as e:
@@ -229,8 +317,8 @@ class GoogleOAuthService:
                     'message': 'Gmail not connected'
                 }
             
-            with open(self.CREDENTIALS_FILE, 'r') as f:
-                creds_data = json.load(f)
+            with open(self.CREDENTIALS_FILE, 'rb') as f:
+                creds_data = _loads_json(f.read())
             
             return {
                 'connected': True,
@@ -256,6 +344,8 @@ class GoogleOAuthService:
         try:
             if os.path.exists(self.CREDENTIALS_FILE):
                 os.remove(self.CREDENTIALS_FILE)
+            self._creds_cache = None
+            self._gmail_sessions = threading.local()
             
             return {
                 'success': True,
@@ -269,12 +359,70 @@ class GoogleOAuthService:
                 'message': 'Error disconnecting Gmail account'
             }
     
+    def _get_gmail_session(self, credentials: 'Credentials'):
+        """
+        Get an authorized HTTP session for the credentials, reusing the cached one.
+        
+        The session keeps its connection to the Gmail API alive between sends.
+        
+        Args:
+            credentials: Google OAuth credentials
+            
+        Returns:
+            google.auth AuthorizedSession
+        """
+        local = self._gmail_sessions
+        if getattr(local, 'session', None) is None or local.creds_id != id(credentials):
+            from google.auth.transport.requests import AuthorizedSession
+            
+            local.session = AuthorizedSession(credentials)
+            local.creds_id = id(credentials)
+        return local.session
+    
+    def _build_raw_text_message(self, recipient_email: str, subject: str, body: str) -> str:
+        """
+        Assemble a plain-text RFC 5322 message directly as bytes.
+        
+        Skips the email package generator for the common single-part case and
+        falls back to MIMEText when headers need folding or escaping.
+        
+        Args:
+            recipient_email: Email address of the recipient
+            subject: Email subject
+            body: Plain text email body
+            
+        Returns:
+            URL-safe base64 encoded message for the Gmail API
+        """
+        if not recipient_email.isascii() or any(c in recipient_email + subject for c in '\r\n'):
+            message = MIMEText(body)
+            message['to'] = recipient_email
+            message['subject'] = subject
+            return base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        
+        if not subject.isascii():
+            # Folded continuation lines must end in CRLF like the rest of the message
+            subject = Header(subject, 'utf-8').encode(linesep='\r\n')
+        
+        if body.isascii() and all(len(line) <= 998 for line in body.splitlines()):
+            content_headers = 'Content-Type: text/plain; charset="us-ascii"\r\nContent-Transfer-Encoding: 7bit'
+            payload = body.replace('\r\n', '\n').replace('\n', '\r\n')
+        else:
+            content_headers = 'Content-Type: text/plain; charset="utf-8"\r\nContent-Transfer-Encoding: base64'
+            payload = base64.encodebytes(body.encode('utf-8')).decode('ascii').replace('\n', '\r\n')
+        
+        raw = (
+            f"MIME-Version: 1.0\r\n{content_headers}\r\n"
+            f"To: {recipient_email}\r\nSubject: {subject}\r\n\r\n{payload}"
+        )
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+    
     def send_email_via_gmail(
         self,
         recipient_email: str,
         subject: str,
         body: str,
-        attachments: Optional[List[str]] = None
+        attachments: Optional[List[Union[str, Tuple[str, Union[bytes, BinaryIO]]]]] = None
     ) -> Dict:
         """
         Send email using Gmail API with optional attachments.
@@ -283,7 +431,7 @@ class GoogleOAuthService:
             recipient_email: Email address of the recipient
             subject: Email subject
             body: Email body (plain text or HTML)
-            attachments: Optional list of file paths to attach
+            attachments: Optional list of file paths or (filename, content) pairs to attach
             
         Returns:
             Dictionary with success status and message
@@ -297,8 +445,7 @@ class GoogleOAuthService:
                     'message': 'Gmail not connected. Please connect your Gmail account first.'
                 }
             
-            # Build Gmail service
-            service = build('gmail', 'v1', credentials=credentials)
+            session = self._get_gmail_session(credentials)
             
             # Create message with or without attachments
             if attachments:
@@ -312,55 +459,67 @@ class GoogleOAuthService:
                 message.attach(msg_body)
                 
                 # Add attachments
-                for file_path in attachments:
-                    if os.path.exists(file_path):
-                        try:
-                            # Get MIME type dynamically
-                            mime_type = get_mime_type(file_path)
-                            if '/' in mime_type:
-                                main_type, sub_type = mime_type.split('/', 1)
-                            else:
-                                # Fallback to octet-stream if invalid MIME type
-                                main_type, sub_type = 'application', 'octet-stream'
-                            
-                            with open(file_path, 'rb') as f:
-                                part = MIMEBase(main_type, sub_type)
-                                part.set_payload(f.read())
-                                encoders.encode_base64(part)
-                                part.add_header(
-                                    'Content-Disposition',
-                                    f'attachment; filename={os.path.basename(file_path)}'
-                                )
-                                message.attach(part)
-                        except (OSError, IOError) as e:
-                            logging.error(f"Error attaching file {file_path}: {str(e)}")
+                for attachment in attachments:
+                    # Attachments are file paths, or (filename, content) pairs
+                    # already opened and validated by the caller
+                    if isinstance(attachment, tuple):
+                        filename, content = attachment
+                    elif os.path.exists(attachment):
+                        filename, content = os.path.basename(attachment), None
+                    else:
+                        continue
+                    try:
+                        # Get MIME type dynamically
+                        mime_type = get_mime_type(filename)
+                        if '/' in mime_type:
+                            main_type, sub_type = mime_type.split('/', 1)
+                        else:
+                            # Fallback to octet-stream if invalid MIME type
+                            main_type, sub_type = 'application', 'octet-stream'
+                        
+                        if content is None:
+                            with open(attachment, 'rb') as f:
+                                payload = f.read()
+                        elif isinstance(content, bytes):
+                            payload = content
+                        else:
+                            content.seek(0)
+                            payload = content.read()
+                        
+                        part = MIMEBase(main_type, sub_type)
+                        part.set_payload(payload)
+                        encoders.encode_base64(part)
+                        part.add_header(
+                            'Content-Disposition',
+                            f'attachment; filename={filename}'
+                        )
+                        message.attach(part)
+                    except (OSError, IOError) as e:
+                        logging.error(f"Error attaching file {filename}: {str(e)}")
                 
                 raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
             else:
                 # Simple message without attachments
-                message = MIMEText(body)
-                message['to'] = recipient_email
-                message['subject'] = subject
-                raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+                raw_message = self._build_raw_text_message(recipient_email, subject, body)
             
             # Send message
-            result = service.users().messages().send(
-                userId='me',
-                body={'raw': raw_message}
-            ).execute()
+            response = session.post(self.GMAIL_SEND_URL, json={'raw': raw_message})
+            if response.status_code >= 400:
+                logging.error(f"Gmail API error: {response.status_code} {response.text}")
+                if response.status_code in (401, 403):
+                    # Open a new session on the next send in case credentials changed
+                    self._gmail_sessions.session = None
+                return {
+                    'success': False,
+                    'message': 'Failed to send email via Gmail API'
+                }
             
             return {
                 'success': True,
                 'message': f'Email sent successfully to {recipient_email}',
-                'message_id': result.get('id')
+                'message_id': response.json().get('id')
             }
             
-        except HttpError as e:
-            logging.error(f"Gmail API error: {str(e)}")
-            return {
-                'success': False,
-                'message': 'Failed to send email via Gmail API'
-            }
         except Exception as e:
             logging.error(f"Error sending email: {str(e)}")
             return {
@@ -369,5 +528,20 @@ class GoogleOAuthService:
             }
 
 
-# Singleton instance
-google_oauth_service = GoogleOAuthService()
+# Singleton instance - initialized on first use
+_google_oauth_service = None
+
+def get_google_oauth_service():
+    """Get or create the Google OAuth service singleton."""
+    global _google_oauth_service
+    if _google_oauth_service is None:
+        _google_oauth_service = GoogleOAuthService()
+    return _google_oauth_service
+
+# For backward compatibility
+class _GoogleServiceProxy:
+    """Proxy to lazily initialize the service."""
+    def __getattr__(self, name):
+        return getattr(get_google_oauth_service(), name)
+
+google_oauth_service = _GoogleServiceProxy()
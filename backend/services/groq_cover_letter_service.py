@@ -3,17 +3,556 @@ Groq-powered Cover Letter Generator Service.
 Uses Groq LLM for ultra-targeted cover letter generation with skill-matching.
 """
 
+import asyncio
+import bisect
+import contextlib
+import hashlib
+import heapq
+import io
+import json
+import logging
 import os
 import re
-from typing import Dict, List, Tuple
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import httpx
+import numpy as np
 from dotenv import load_dotenv
-from groq import Groq
+from groq import APIConnectionError, AsyncGroq, Groq, InternalServerError, RateLimitError
+from services.utils import run_sync
+
+try:
+    import ahocorasick
+except ImportError:
+    # Skill matching falls back to pairwise substring checks
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    # Cache keys are serialized with the stdlib encoder instead
+    orjson = None
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    # httpx only speaks HTTP/2 with the h2 package installed
+    HTTP2_AVAILABLE = False
+
+# Get logger (don't configure at module level)
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
 # Constants
 MAX_RESPONSIBILITY_LENGTH = 100  # Maximum characters for experience descriptions
+DEFAULT_BATCH_CONCURRENCY = 16  # Maximum in-flight Groq requests in generate_many
+DEFAULT_MODEL = "llama-3.1-8b-instant"  # Fast model, ample for a 280-word letter
+DEFAULT_QUALITY_MODEL = "llama-3.3-70b-versatile"  # Used for long prompts or quality=True
+QUALITY_PROMPT_THRESHOLD = 6000  # Prompt length (characters) above which the quality model is used
+MAX_SKILL_MATCHES = 10  # Skill matches kept for the prompt and the match report
+# Connection pool shared by all Groq requests of a client
+GROQ_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0)
+# Short read timeout: with streaming it bounds the wait per chunk, so a stalled
+# Groq request fails over quickly instead of hanging
+GROQ_HTTP_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+GROQ_MAX_RETRIES = 1  # SDK retries (with backoff) before falling back to OpenAI
+DEFAULT_FALLBACK_MODEL = "gpt-4o-mini"
+# Closing each letter must end with, by language; also used as stop sequence
+LETTER_CLOSINGS = {'fr': 'Cordialement,', 'en': 'Sincerely,'}
+BATCH_COMPLETION_WINDOW = "24h"  # Groq batch jobs finish within this window, at a discount
+# Batch job statuses after which no results will ever arrive
+BATCH_FAILED_STATUSES = frozenset(['failed', 'expired', 'cancelled', 'cancelling'])
+LETTER_CACHE_SIZE = 256  # Generated letters kept for identical (CV, job, message) requests
+CANDIDATE_CACHE_SIZE = 64  # Extracted candidate profiles kept per CV
+
+# CV fields read by _extract_candidate_info (raw_text is large and unused)
+CANDIDATE_FIELDS = ('name', 'email', 'phone', 'skills', 'experience', 'education', 'certifications')
+# Job fields read when building the prompt
+JOB_PROMPT_FIELDS = ('title', 'company', 'organization', 'location', 'description', 'description_text', 'requirements')
+COVER_LETTER_MAX_TOKENS = 500  # 280 words in French is ~450 tokens; the stop sequence ends it earlier
+
+# Separators between requirements in a free-text job description
+REQUIREMENT_SPLIT_PATTERN = re.compile(r'[;,]\s*(?=[A-Z])|Requirements:\s*|Qualifications:\s*')
+
+# Capitalized words, tech terms, or words with numbers/special chars.
+# Case-sensitive on purpose: capitalization is what marks a candidate term.
+TECH_WORD_PATTERN = re.compile(r'\b[A-Z][A-Za-z]*\b|[a-z]+(?:\+\+|\.js|[0-9])')
+
+
+# Encoding of ReportLab's standard fonts (Helvetica, Times, ...)
+PDF_FONT_ENCODING = 'cp1252'
+
+
+def _pdf_encodable(char: str) -> bool:
+    """Whether the standard PDF fonts can render char."""
+    try:
+        char.encode(PDF_FONT_ENCODING)
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+class _PdfTranslationTable(dict):
+    """
+    str.translate table that keeps characters the PDF fonts can render.
+    
+    Lookups for ASCII characters raise LookupError so translate leaves them
+    unchanged; other characters are kept when WinAnsi covers them and dropped
+    otherwise. Resolved entries are stored so each character is resolved once.
+    """
+    
+    def __missing__(self, codepoint: int):
+        if codepoint < 128:
+            raise LookupError(codepoint)
+        char = chr(codepoint)
+        value = char if _pdf_encodable(char) else None
+        self[codepoint] = value
+        return value
+
+
+def _latin_ascii_equivalents() -> Dict[int, str]:
+    """
+    Map accented Latin letters the PDF fonts cannot render to ASCII.
+    
+    Latin-1 letters (é, à, ç, ...) are rendered as-is. The rest of Latin
+    Extended-A/B is decomposed with NFKD and stripped of combining marks;
+    the few letters without a decomposition are listed here.
+    """
+    mapping = {ord(char): ascii_text for char, ascii_text in {
+        'Đ': 'D', 'đ': 'd', 'Ł': 'L', 'ł': 'l',
+    }.items()}
+    for codepoint in range(0x100, 0x250):
+        if codepoint in mapping or _pdf_encodable(chr(codepoint)):
+            continue
+        decomposed = unicodedata.normalize('NFKD', chr(codepoint))
+        ascii_text = ''.join(c for c in decomposed if not unicodedata.combining(c))
+        if ascii_text.isascii() and ascii_text.isalpha():
+            mapping[codepoint] = ascii_text
+    return mapping
+
+
+# PDF-safe equivalents for characters commonly produced by the LLM, built once
+PDF_TRANSLATION_TABLE = _PdfTranslationTable(_latin_ascii_equivalents())
+PDF_TRANSLATION_TABLE.update(str.maketrans({
+    # Smart quotes
+    '\u201c': '"', '\u201d': '"', '\u00ab': '"', '\u00bb': '"',
+    '\u2018': "'", '\u2019': "'",
+    # Em/en dashes, bullets, ellipsis, non-breaking space
+    '\u2014': '-', '\u2013': '-', '\u2022': '-',
+    '\u2026': '...', '\u00a0': ' ',
+}))
+
+
+def _is_groq_unavailable(exc: BaseException) -> bool:
+    """Whether a Groq error means the service is degraded (rate limit, timeout, 5xx)."""
+    # APITimeoutError is a subclass of APIConnectionError
+    return isinstance(exc, (RateLimitError, APIConnectionError, InternalServerError))
+
+
+def _unique_stripped(items) -> List[str]:
+    """
+    Strip items and drop empty ones and case-insensitive duplicates, keeping order.
+    
+    Args:
+        items: Strings such as skills or requirements
+        
+    Returns:
+        First occurrence of each distinct item, stripped
+    """
+    seen = set()
+    unique = []
+    for item in items:
+        item = item.strip()
+        key = item.lower()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+
+def _canonical_json(value) -> bytes:
+    """
+    Serialize value with sorted keys, for hashing into cache keys.
+    
+    Uses orjson when available; values it rejects (e.g. integers beyond
+    64 bits) go through the stdlib encoder.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(value, sort_keys=True, default=str).encode('utf-8')
+
+
+def _fields_json(data: Dict, fields: Tuple[str, ...]) -> bytes:
+    """
+    Canonical JSON of the given fields of data, for hashing into cache keys.
+    
+    Absent fields are left out rather than written as null, since callers
+    fall back to defaults for missing keys but not for None values.
+    """
+    return _canonical_json({field: data[field] for field in fields if field in data})
+
+
+# Phrases that mark a job description as French
+FRENCH_MARKERS = frozenset(['développement', 'expérience', 'équipe', 'nous recherchons'])
+# Case-insensitive search for any marker, without lowercasing the description
+FRENCH_MARKER_PATTERN = re.compile('|'.join(map(re.escape, sorted(FRENCH_MARKERS))), re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def _is_french_description(description: str) -> bool:
+    """
+    Detect whether a job description is written in French.
+    
+    Cached on the description so repeated generations for one job skip the scan.
+    
+    Args:
+        description: Job description text
+        
+    Returns:
+        True if any French marker phrase occurs in the description
+    """
+    return FRENCH_MARKER_PATTERN.search(description) is not None
+
+
+@lru_cache(maxsize=512)
+def _bullet_list(items: Tuple[str, ...]) -> str:
+    """
+    Render items as a "- item" list for the prompt.
+    
+    Cached because the same CV and job blocks recur across generations.
+    
+    Args:
+        items: Lines to render
+        
+    Returns:
+        Newline-separated bullet list
+    """
+    return '\n'.join(f"- {item}" for item in items)
+
+
+@lru_cache(maxsize=32)
+def _build_automaton(words: Tuple[str, ...]):
+    """
+    Build an Aho-Corasick automaton mapping each word to its positions.
+    
+    Cached so a CV matched against many job offers is only compiled once.
+    
+    Args:
+        words: Lowercased words to search for
+        
+    Returns:
+        Automaton whose values are the tuple of indices of each word
+    """
+    return _make_automaton(words)
+
+
+def _make_automaton(words: Tuple[str, ...]):
+    """Uncached body of _build_automaton, for one-off word lists."""
+    positions: Dict[str, List[int]] = {}
+    for index, word in enumerate(words):
+        positions.setdefault(word, []).append(index)
+    
+    automaton = ahocorasick.Automaton()
+    for word, indices in positions.items():
+        automaton.add_word(word, tuple(indices))
+    automaton.make_automaton()
+    return automaton
+
+
+def _iter_term_hits(automaton, words: List[str], terms: List[str]):
+    """
+    Run an automaton over every term and yield where its words occur.
+    
+    The terms are scanned as one NUL-joined string, so the automaton is
+    entered once instead of once per term.
+    
+    Args:
+        automaton: Automaton built by _build_automaton over words
+        words: Words the automaton was built from
+        terms: Texts to scan, in order
+        
+    Yields:
+        (term index, indices of the words found) in term order
+    """
+    if any('\0' in word for word in words):
+        # A word containing the separator could match across two terms
+        for term_index, term in enumerate(terms):
+            for _, word_indices in automaton.iter(term):
+                yield term_index, word_indices
+        return
+    
+    offsets = []
+    offset = 0
+    for term in terms:
+        offsets.append(offset)
+        offset += len(term) + 1
+    
+    for end, word_indices in automaton.iter('\0'.join(terms)):
+        yield bisect.bisect_right(offsets, end) - 1, word_indices
+
+
+def _first_matches_aho_corasick(
+    cv_skills_lower: List[str],
+    job_requirements_lower: List[str]
+) -> List[Optional[int]]:
+    """
+    For each CV skill, find the index of the first requirement it matches.
+    
+    A skill matches a requirement when they are equal, or when either one
+    (longer than 3 characters) is a substring of the other.
+    
+    Args:
+        cv_skills_lower: Lowercased CV skills
+        job_requirements_lower: Lowercased job requirements, in priority order
+        
+    Returns:
+        Requirement index per CV skill, or None when nothing matches
+    """
+    first: List[Optional[int]] = [None] * len(cv_skills_lower)
+    
+    # Skill found inside a requirement; hits arrive in requirement order
+    skill_automaton = _build_automaton(tuple(cv_skills_lower))
+    for req_index, skill_indices in _iter_term_hits(skill_automaton, cv_skills_lower, job_requirements_lower):
+        for skill_index in skill_indices:
+            if first[skill_index] is not None:
+                continue
+            skill_lower = cv_skills_lower[skill_index]
+            if len(skill_lower) > 3 or skill_lower == job_requirements_lower[req_index]:
+                first[skill_index] = req_index
+    
+    # Requirement found inside a skill
+    long_requirements = tuple(req for req in job_requirements_lower if len(req) > 3)
+    if long_requirements:
+        long_indices = [i for i, req in enumerate(job_requirements_lower) if len(req) > 3]
+        req_automaton = _build_automaton(long_requirements)
+        for skill_index, skill_lower in enumerate(cv_skills_lower):
+            for _, req_positions in req_automaton.iter(skill_lower):
+                req_index = long_indices[req_positions[0]]
+                if first[skill_index] is None or req_index < first[skill_index]:
+                    first[skill_index] = req_index
+    
+    return first
+
+
+def _first_matches_scan(
+    cv_skills_lower: List[str],
+    job_requirements_lower: List[str]
+) -> List[Optional[int]]:
+    """
+    Same contract as _first_matches_aho_corasick, without pyahocorasick.
+    
+    Exact matches come from a hash lookup and "skill in requirement" from one
+    find over all requirements joined together; only requirements before the
+    match found so far are checked for "requirement in skill".
+    
+    Args:
+        cv_skills_lower: Lowercased CV skills
+        job_requirements_lower: Lowercased job requirements, in priority order
+        
+    Returns:
+        Requirement index per CV skill, or None when nothing matches
+    """
+    exact: Dict[str, int] = {}
+    for req_index, job_req_lower in enumerate(job_requirements_lower):
+        exact.setdefault(job_req_lower, req_index)
+    
+    # NUL never occurs in parsed text, so a find cannot straddle requirements
+    haystack = '\0'.join(job_requirements_lower)
+    offsets = []
+    offset = 0
+    for job_req_lower in job_requirements_lower:
+        offsets.append(offset)
+        offset += len(job_req_lower) + 1
+    
+    first: List[Optional[int]] = []
+    for skill_lower in cv_skills_lower:
+        best = exact.get(skill_lower)
+        if len(skill_lower) > 3 and '\0' not in skill_lower:
+            position = haystack.find(skill_lower)
+            if position != -1:
+                req_index = bisect.bisect_right(offsets, position) - 1
+                if best is None or req_index < best:
+                    best = req_index
+        
+        limit = len(job_requirements_lower) if best is None else best
+        for req_index in range(limit):
+            job_req_lower = job_requirements_lower[req_index]
+            if len(job_req_lower) > 3 and job_req_lower in skill_lower:
+                best = req_index
+                break
+        first.append(best)
+    
+    return first
+
+
+def _match_terms(job_requirements: Tuple[str, ...], description: str) -> List[str]:
+    """
+    List the terms CV skills are matched against: requirements, then keywords.
+    
+    Args:
+        job_requirements: Job requirements
+        description: Job description text
+        
+    Returns:
+        Requirements followed by description keywords, in priority order
+    """
+    terms = list(job_requirements)
+    
+    # Extract potential skill keywords from job description (more conservative)
+    if description:
+        terms.extend(_description_keywords(description))
+    
+    return terms
+
+
+@lru_cache(maxsize=256)
+def _description_keywords(description: str) -> Tuple[str, ...]:
+    """
+    Find candidate skill keywords in a job description.
+    
+    Cached on the description, so batch matching and repeated requests for
+    one job scan it once.
+    
+    Args:
+        description: Job description text
+        
+    Returns:
+        Capitalized words, tech terms, or words with numbers/special chars
+        longer than 3 characters, in order of appearance
+    """
+    return tuple(word for word in TECH_WORD_PATTERN.findall(description) if len(word) > 3)
+
+
+def _batch_first_matches(
+    cv_skills_lower: List[str],
+    jobs_terms_lower: List[List[str]]
+) -> np.ndarray:
+    """
+    _first_matches_aho_corasick for many jobs at once.
+    
+    Every job's terms are scanned in one pass over a shared automaton, and the
+    first matching term per (job, skill) is reduced with numpy.minimum.at.
+    
+    Args:
+        cv_skills_lower: Lowercased CV skills
+        jobs_terms_lower: Lowercased match terms of each job, in priority order
+        
+    Returns:
+        (jobs x skills) array of first matching term index, or -1 for no match
+    """
+    flat_terms = [term for terms in jobs_terms_lower for term in terms]
+    lengths = np.fromiter((len(terms) for terms in jobs_terms_lower), dtype=np.intp, count=len(jobs_terms_lower))
+    job_of = np.repeat(np.arange(len(jobs_terms_lower)), lengths)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.intp)
+    
+    hit_terms: List[int] = []
+    hit_skills: List[int] = []
+    
+    # Skill found inside a term
+    skill_automaton = _build_automaton(tuple(cv_skills_lower))
+    for term_index, skill_indices in _iter_term_hits(skill_automaton, cv_skills_lower, flat_terms):
+        for skill_index in skill_indices:
+            skill_lower = cv_skills_lower[skill_index]
+            if len(skill_lower) > 3 or skill_lower == flat_terms[term_index]:
+                hit_terms.append(term_index)
+                hit_skills.append(skill_index)
+    
+    # Term found inside a skill
+    long_indices = [i for i, term in enumerate(flat_terms) if len(term) > 3]
+    if long_indices:
+        term_automaton = _make_automaton(tuple(flat_terms[i] for i in long_indices))
+        for skill_index, skill_lower in enumerate(cv_skills_lower):
+            for _, term_positions in term_automaton.iter(skill_lower):
+                for position in term_positions:
+                    hit_terms.append(long_indices[position])
+                    hit_skills.append(skill_index)
+    
+    no_match = np.iinfo(np.intp).max
+    first = np.full((len(jobs_terms_lower), len(cv_skills_lower)), no_match, dtype=np.intp)
+    if hit_terms:
+        hit_terms_arr = np.asarray(hit_terms, dtype=np.intp)
+        hit_jobs = job_of[hit_terms_arr]
+        np.minimum.at(first, (hit_jobs, np.asarray(hit_skills, dtype=np.intp)), hit_terms_arr - starts[hit_jobs])
+    first[first == no_match] = -1
+    return first
+
+
+def _match_score(pair: Tuple[str, str]) -> float:
+    """
+    Score a (skill, term) match by how much of the longer text it covers.
+    
+    One side always contains the other, so the overlap is the shorter one.
+    
+    Args:
+        pair: (candidate_skill, matched_requirement)
+        
+    Returns:
+        Overlap ratio in (0, 1]; 1.0 for an exact match
+    """
+    skill, term = pair
+    return min(len(skill), len(term)) / max(len(skill), len(term), 1)
+
+
+def _top_matches(matched: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Keep the best MAX_SKILL_MATCHES matches, strongest first.
+    
+    A skill that names the requirement outright beats one found inside a long
+    requirement sentence; ties keep CV order.
+    
+    Args:
+        matched: (candidate_skill, matched_requirement) pairs in CV order
+        
+    Returns:
+        Up to MAX_SKILL_MATCHES pairs
+    """
+    return heapq.nlargest(MAX_SKILL_MATCHES, matched, key=_match_score)
+
+
+@lru_cache(maxsize=128)
+def _match_skills_cached(
+    cv_skills: Tuple[str, ...],
+    job_requirements: Tuple[str, ...],
+    description: str
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    Match candidate skills with job requirements and description keywords.
+    
+    Args:
+        cv_skills: Candidate skills
+        job_requirements: Job requirements
+        description: Job description text
+        
+    Returns:
+        Up to MAX_SKILL_MATCHES (candidate_skill, matched_requirement) pairs,
+        best match first
+    """
+    job_requirements = _match_terms(job_requirements, description)
+    
+    if not cv_skills:
+        return ()
+    
+    # Find matches using word boundary matching to avoid false positives
+    matched = []
+    find_first_matches = _first_matches_aho_corasick if ahocorasick is not None else _first_matches_scan
+    first_matches = find_first_matches(
+        [skill.lower() for skill in cv_skills],
+        [req.lower() for req in job_requirements]
+    )
+    for cv_skill, req_index in zip(cv_skills, first_matches):
+        if req_index is not None:
+            matched.append((cv_skill, job_requirements[req_index]))
+    
+    return tuple(_top_matches(matched))
 
 
 class GroqCoverLetterService:
@@ -21,435 +560,1066 @@ class GroqCoverLetterService:
     Service for generating skill-matching-driven cover letters using Groq LLM.
     """
     
-    def __init__(self):
-        """Initialize Groq client with API key."""
-        api_key = os.getenv('GROQ_API_KEY')
-        if not api_key:
-            raise ValueError(
-                "GROQ_API_KEY not found in environment variables. "
-                "Please set it in your .env file."
-            )
-        self.client = Groq(api_key=api_key)
-        self.model = "mixtral-8x7b-32768"  # High-quality model with large context
+    __slots__ = (
+        '_api_key',
+        'client',
+        'model',
+        'quality_model',
+        'max_tokens',
+        'fallback_model',
+        '_openai_api_key',
+        '_fallback_client',
+        '_letter_cache',
+        '_candidate_cache',
+        '_cache_lock',
+    )
     
-    def _extract_skills(self, cv_data: Dict) -> List[str]:
+    # Prompt templates, filled with str.format_map in _build_messages
+    _PROMPT_TEMPLATE_FR = """MISSION : Redige une lettre de motivation ULTRA-CIBLEE pour ce match job/candidat.
+
+=== OFFRE D'EMPLOI ===
+Poste : {job_title}
+Entreprise : {company}
+Localisation : {location}
+Description : {job_description}
+Exigences cles :
+{requirements}
+
+=== PROFIL CANDIDAT : {name} ===
+Contact : {email} | {phone}
+
+Stack technique :
+{skills}
+
+Experience professionnelle :
+{experiences}
+
+Formation :
+{formations}
+
+Certifications :
+{certifications}
+
+=== COMPETENCES QUI MATCHENT ===
+{matches}
+
+=== STRUCTURE OBLIGATOIRE (280 mots MAX) ===
+
+PARAGRAPHE 1 - ACCROCHE CIBLEE (3-4 lignes)
+Commence par UNE competence ou realisation concrete qui matche l'offre.
+Exemple : 'Developper des APIs RESTful avec {top_skill} qui gerent 50K requetes/jour, c'est ce que je fais actuellement.'
+Enchaine sur pourquoi {company} et ce poste specifiquement.
+
+PARAGRAPHE 2 - PREUVES CONCRETES (5-6 lignes)
+Cite 2-3 experiences/projets qui correspondent aux exigences du poste.
+Format : [Projet/Experience] + [Technologies utilisees] + [Resultat/Impact]
+Privilegie les experiences avec les technologies matchees.
+Utilise les VRAIES experiences du candidat listees ci-dessus.
+
+PARAGRAPHE 3 - FIT & VALEUR AJOUTEE (4-5 lignes)
+Explique pourquoi tu es le bon match pour {company}.
+Mentionne la formation si pertinent pour le poste.
+Mets en avant la capacite d'apprentissage et les certifications.
+Ce que tu apportes : competences techniques + mindset professionnel.
+
+PARAGRAPHE 4 - CLOSING PRO (2 lignes)
+'Je serais ravi d'echanger sur comment mes competences peuvent contribuer a [projet/mission de l'entreprise].'
+'Disponible pour un entretien a votre convenance.'
+Termine par 'Cordialement,' UNIQUEMENT.
+
+{custom_message}
+
+=== REGLES D'OR ===
+- Utilise les VRAIES experiences du candidat (pas d'invention)
+- Adapte chaque phrase au poste vise
+- Mentionne des technologies/projets concrets
+- Phrases courtes : 15-20 mots max
+- ZERO cliche : 'dynamique', 'motive', 'passionne' = INTERDIT
+- Ton professionnel mais moderne (pas guinde)
+- Pas de signature finale (juste 'Cordialement,')
+
+GO ! Redige cette lettre maintenant."""
+    
+    _PROMPT_TEMPLATE_EN = """MISSION: Write an ULTRA-TARGETED cover letter for this job/candidate match.
+
+=== JOB OFFER ===
+Position: {job_title}
+Company: {company}
+Location: {location}
+Description: {job_description}
+Key Requirements:
+{requirements}
+
+=== CANDIDATE PROFILE: {name} ===
+Contact: {email} | {phone}
+
+Technical Stack:
+{skills}
+
+Professional Experience:
+{experiences}
+
+Education:
+{formations}
+
+Certifications:
+{certifications}
+
+=== MATCHING SKILLS ===
+{matches}
+
+=== MANDATORY STRUCTURE (280 words MAX) ===
+
+PARAGRAPH 1 - TARGETED HOOK (3-4 lines)
+Start with ONE concrete skill or achievement matching the offer.
+Example: 'Building RESTful APIs with {top_skill} handling 50K requests/day is what I do currently.'
+Connect to why {company} and this specific position.
+
+PARAGRAPH 2 - CONCRETE PROOF (5-6 lines)
+Cite 2-3 experiences/projects matching job requirements.
+Format: [Project/Experience] + [Technologies used] + [Result/Impact]
+Prioritize experiences with matched technologies.
+Use REAL candidate experiences listed above.
+
+PARAGRAPH 3 - FIT & VALUE ADD (4-5 lines)
+Explain why you're the right match for {company}.
+Mention education if relevant for the position.
+Highlight learning capacity and certifications.
+What you bring: technical skills + professional mindset.
+
+PARAGRAPH 4 - PROFESSIONAL CLOSING (2 lines)
+'I would be delighted to discuss how my skills can contribute to [company project/mission].'
+'Available for an interview at your convenience.'
+End with 'Sincerely,' ONLY.
+
+{custom_message}
+
+=== GOLDEN RULES ===
+- Use REAL candidate experiences (no invention)
+- Adapt each sentence to target position
+- Mention concrete technologies/projects
+- Short sentences: 15-20 words max
+- ZERO cliches: 'dynamic', 'motivated', 'passionate' = FORBIDDEN
+- Professional but modern tone (not stiff)
+- No final signature (just 'Sincerely,')
+
+GO! Write this letter now."""
+    
+    _SYSTEM_MESSAGE_FR = (
+        "Tu es un expert en recrutement tech qui redige des lettres de motivation "
+        "sur mesure. Tu analyses le profil du candidat et l'offre d'emploi pour creer "
+        "un pitch parfait qui met en avant les competences pertinentes. "
+        "Style : direct, factuel, professionnel mais moderne. Zero bullshit. "
+        "Reponds uniquement avec le texte de la lettre, sans titre, preambule ni commentaire."
+    )
+    
+    _SYSTEM_MESSAGE_EN = (
+        "You are a tech recruitment expert who writes tailored cover letters. "
+        "You analyze the candidate's profile and job offer to create "
+        "a perfect pitch highlighting relevant skills. "
+        "Style: direct, factual, professional but modern. No bullshit. "
+        "Reply with the letter text only: no title, preamble or commentary."
+    )
+    
+    def __init__(self, model: Optional[str] = None, quality_model: Optional[str] = None):
+        """
+        Initialize Groq client with API key.
+        
+        Args:
+            model: Groq model for regular requests (default: GROQ_COVER_LETTER_MODEL
+                or DEFAULT_MODEL)
+            quality_model: Groq model for long prompts or quality requests (default:
+                GROQ_COVER_LETTER_MODEL_QUALITY or DEFAULT_QUALITY_MODEL)
+        """
+        api_key = os.getenv('GROQ_API_KEY')
+        if not api_key:
+            raise ValueError(
+                "GROQ_API_KEY not found in environment variables. "
+                "Please set it in your .env file."
+            )
+        self._api_key = api_key
+        self.client = Groq(
+            api_key=api_key,
+            http_client=httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                limits=GROQ_HTTP_LIMITS,
+                timeout=GROQ_HTTP_TIMEOUT,
+                follow_redirects=True
+            ),
+            max_retries=GROQ_MAX_RETRIES
+        )
+        self.model = model or os.getenv('GROQ_COVER_LETTER_MODEL', DEFAULT_MODEL)
+        self.quality_model = quality_model or os.getenv('GROQ_COVER_LETTER_MODEL_QUALITY', DEFAULT_QUALITY_MODEL)
+        self.max_tokens = int(os.getenv('GROQ_COVER_LETTER_MAX_TOKENS', COVER_LETTER_MAX_TOKENS))
+        
+        # OpenAI takes over when Groq is unavailable, if OPENAI_API_KEY is set;
+        # its clients are created on first fallback
+        self._openai_api_key = os.getenv('OPENAI_API_KEY')
+        self.fallback_model = os.getenv('MODEL_NAME', DEFAULT_FALLBACK_MODEL)
+        self._fallback_client = None
+        
+        # Generated letters keyed by a digest of the request, least recently used first
+        self._letter_cache: OrderedDict = OrderedDict()
+        # Extracted candidate info keyed by a digest of the CV fields it reads
+        self._candidate_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    @contextlib.asynccontextmanager
+    async def _async_clients(self):
+        """
+        Open the async clients for one batch of requests.
+        
+        Their HTTP pools are bound to the running event loop, and the sync
+        wrappers run each batch on a fresh loop (see run_sync), so the clients
+        are opened per batch and closed when it is done.
+        
+        Yields:
+            (AsyncGroq client, AsyncOpenAI fallback client or None without API key)
+        """
+        async with contextlib.AsyncExitStack() as stack:
+            client = await stack.enter_async_context(AsyncGroq(
+                api_key=self._api_key,
+                http_client=httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    limits=GROQ_HTTP_LIMITS,
+                    timeout=GROQ_HTTP_TIMEOUT,
+                    follow_redirects=True
+                ),
+                max_retries=GROQ_MAX_RETRIES
+            ))
+            fallback_client = None
+            if self._openai_api_key:
+                from openai import AsyncOpenAI
+                fallback_client = await stack.enter_async_context(AsyncOpenAI(api_key=self._openai_api_key))
+            yield client, fallback_client
+    
+    @property
+    def fallback_client(self):
+        """Sync OpenAI client used when Groq is unavailable (None without API key)."""
+        if self._fallback_client is None and self._openai_api_key:
+            from openai import OpenAI
+            self._fallback_client = OpenAI(api_key=self._openai_api_key)
+        return self._fallback_client
+    
+    def _extract_skills(self, cv_data: Dict) -> List[str]:
+        """
+        Extract skills from CV data.
+        
+        Args:
+            cv_data: Parsed CV data
+            
+        Returns:
+            List of skills, without case-insensitive duplicates
+        """
+        return _unique_stripped(cv_data.get('skills', []))
+    
+    def _extract_job_requirements(self, job_data: Dict) -> List[str]:
+        """
+        Extract requirements from job data.
+        
+        Args:
+            job_data: Job offer data
+            
+        Returns:
+            List of requirements, without case-insensitive duplicates
+        """
+        requirements = job_data.get('requirements', [])
+        
+        # Also extract from description if available
+        description = job_data.get('description', '') or job_data.get('description_text', '')
+        
+        # If no explicit requirements, extract from description
+        if not requirements and description:
+            # Look for requirement patterns in description
+            # Split on common separators and patterns
+            req_patterns = REQUIREMENT_SPLIT_PATTERN.split(description)
+            requirements = [req.strip() for req in req_patterns if req.strip() and len(req.strip()) > 10]
+        
+        return _unique_stripped(requirements or [])
+    
+    def _match_skills(
+        self,
+        cv_data: Dict,
+        job_data: Dict,
+        job_requirements: Optional[List[str]] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Match candidate skills with job requirements.
+        
+        Args:
+            cv_data: Parsed CV data
+            job_data: Job offer data
+            job_requirements: Requirements already extracted from job_data, if any
+            
+        Returns:
+            List of tuples (candidate_skill, matched_requirement)
+        """
+        cv_skills = self._extract_skills(cv_data)
+        if job_requirements is None:
+            job_requirements = self._extract_job_requirements(job_data)
+        description = job_data.get('description', '') or job_data.get('description_text', '')
+        
+        # Cached on content: a report and a letter for the same pair share the work
+        return list(_match_skills_cached(tuple(cv_skills), tuple(job_requirements), description))
+    
+    def _extract_candidate_info(self, cv_data: Dict) -> Dict:
+        """
+        Extract comprehensive candidate information from CV data.
+        
+        Results are cached per CV content, so generating letters for many
+        jobs parses the CV once.
+        
+        Args:
+            cv_data: Parsed CV data
+            
+        Returns:
+            Dictionary with candidate information (shared; do not mutate)
+        """
+        key = hashlib.blake2b(
+            _fields_json(cv_data, CANDIDATE_FIELDS),
+            digest_size=16
+        ).digest()
+        with self._cache_lock:
+            candidate_info = self._candidate_cache.get(key)
+            if candidate_info is not None:
+                self._candidate_cache.move_to_end(key)
+                return candidate_info
+        
+        candidate_info = self._parse_candidate_info(cv_data)
+        with self._cache_lock:
+            self._candidate_cache[key] = candidate_info
+            if len(self._candidate_cache) > CANDIDATE_CACHE_SIZE:
+                self._candidate_cache.popitem(last=False)
+        return candidate_info
+    
+    def _parse_candidate_info(self, cv_data: Dict) -> Dict:
+        """
+        Build the candidate information used in prompts from CV data.
+        
+        Args:
+            cv_data: Parsed CV data
+            
+        Returns:
+            Dictionary with candidate information
+        """
+        # Extract experiences with more detail
+        experiences = []
+        exp_data = cv_data.get('experience', [])
+        for exp in exp_data[:5]:
+            if isinstance(exp, dict):
+                title = exp.get('title', '')
+                company = exp.get('company', '')
+                responsibilities = exp.get('responsibilities', [])
+                
+                if isinstance(responsibilities, list):
+                    resp_text = '; '.join(responsibilities[:2])
+                else:
+                    resp_text = str(responsibilities)[:MAX_RESPONSIBILITY_LENGTH]
+                
+                if title and company:
+                    exp_str = f"{title} at {company}"
+                    if resp_text:
+                        exp_str += f" - {resp_text}"
+                    experiences.append(exp_str)
+        
+        # Extract formations/education
+        formations = []
+        edu_data = cv_data.get('education', [])
+        for edu in edu_data[:3]:
+            if isinstance(edu, dict):
+                degree = edu.get('degree', '')
+                institution = edu.get('institution', '')
+                if degree:
+                    formations.append(f"{degree}" + (f" - {institution}" if institution else ""))
+        
+        # Extract certifications from raw text or structured data
+        certifications = cv_data.get('certifications', [])
+        if isinstance(certifications, list):
+            certifications = [str(cert) for cert in certifications[:5]]
+        
+        return {
+            'name': cv_data.get('name', 'Candidate'),
+            'email': cv_data.get('email', ''),
+            'phone': cv_data.get('phone', ''),
+            'skills': self._extract_skills(cv_data),
+            'experiences': experiences,
+            'formations': formations,
+            'certifications': certifications
+        }
+    
+    def _normalize_text_for_pdf(self, text: str) -> str:
+        """
+        Normalize text for PDF compatibility.
+        Straightens quotes and dashes, keeps accented letters the PDF fonts
+        can render, and replaces or drops anything else.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Normalized text safe for PDF
+        """
+        # Most LLM output is plain ASCII already
+        if text.isascii():
+            return text
+        
+        # One pass: mapped characters get their equivalent, renderable ones
+        # are kept and anything else is dropped
+        return text.translate(PDF_TRANSLATION_TABLE)
+    
+    def _build_messages(
+        self,
+        cv_data: Dict,
+        job_data: Dict,
+        custom_message: str = ""
+    ) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a cover letter request.
+        
+        Args:
+            cv_data: Parsed CV data with structured information
+            job_data: Job offer data
+            custom_message: Optional custom message to include
+            
+        Returns:
+            System and user messages for the Groq chat completion
+        """
+        # Extract comprehensive candidate information
+        candidate_info = self._extract_candidate_info(cv_data)
+        
+        # Extract job information
+        job_title = job_data.get('title', 'the position')
+        company = job_data.get('company') or job_data.get('organization', 'your company')
+        location = job_data.get('location', '')
+        job_description = job_data.get('description', '') or job_data.get('description_text', '')
+        job_requirements = self._extract_job_requirements(job_data)
+        
+        # Perform skill matching
+        skill_matches = self._match_skills(cv_data, job_data, job_requirements)
+        
+        # Detect language from job description
+        is_french = _is_french_description(job_description)
+        
+        # Build the enhanced prompt with skill matching
+        if is_french:
+            prompt_template = self._PROMPT_TEMPLATE_FR
+            system_message = self._SYSTEM_MESSAGE_FR
+            match_line = "- Candidat a '{0}' => Requis '{1}'"
+            no_match_hint = "Identifier les transferable skills"
+        else:
+            prompt_template = self._PROMPT_TEMPLATE_EN
+            system_message = self._SYSTEM_MESSAGE_EN
+            match_line = "- Candidate has '{0}' => Required '{1}'"
+            no_match_hint = "Identify transferable skills"
+        
+        skills = candidate_info['skills']
+        prompt = prompt_template.format_map({
+            'job_title': job_title,
+            'company': company,
+            'location': location if location else 'Not specified',
+            'job_description': job_description[:600],
+            'requirements': _bullet_list(tuple(job_requirements[:7])),
+            'name': candidate_info['name'],
+            'email': candidate_info['email'],
+            'phone': candidate_info['phone'],
+            'skills': ', '.join(skills[:15]),
+            'experiences': _bullet_list(tuple(candidate_info['experiences'][:5])),
+            'formations': _bullet_list(tuple(candidate_info['formations'][:3])),
+            'certifications': _bullet_list(tuple(candidate_info['certifications'][:3])),
+            'matches': '\n'.join(
+                match_line.format(*match) for match in skill_matches[:5]
+            ) if skill_matches else no_match_hint,
+            'top_skill': skills[0] if skills else 'Python',
+            'custom_message': f"CUSTOM MESSAGE TO INCORPORATE: {custom_message}" if custom_message else "",
+        })
+        
+        return [
+            {
+                "role": "system",
+                "content": system_message
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def _letter_cache_key(
+        self,
+        cv_data: Dict,
+        job_data: Dict,
+        custom_message: str,
+        quality: bool
+    ) -> bytes:
+        """
+        Digest identifying a cover letter request.
+        
+        Only the fields that reach the prompt are hashed, so it is cheap to
+        compute before any prompt work and unaffected by per-upload data such
+        as raw_text or temp_cv_path.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(_fields_json(cv_data, CANDIDATE_FIELDS))
+        digest.update(b'\0')
+        digest.update(_fields_json(job_data, JOB_PROMPT_FIELDS))
+        digest.update(b'\0')
+        digest.update((custom_message or '').encode('utf-8'))
+        digest.update(b'\1' if quality else b'\0')
+        return digest.digest()
+    
+    def _get_cached_letter(self, key: bytes) -> Optional[str]:
+        """Return a cached letter and mark it as recently used."""
+        with self._cache_lock:
+            letter = self._letter_cache.get(key)
+            if letter is not None:
+                self._letter_cache.move_to_end(key)
+            return letter
+    
+    def _store_letter(self, key: bytes, letter: str):
+        """Cache a generated letter, evicting the least recently used one."""
+        with self._cache_lock:
+            self._letter_cache[key] = letter
+            self._letter_cache.move_to_end(key)
+            if len(self._letter_cache) > LETTER_CACHE_SIZE:
+                self._letter_cache.popitem(last=False)
+    
+    def clear_letter_cache(self):
+        """Drop all cached cover letters, e.g. to force fresh generations."""
+        with self._cache_lock:
+            self._letter_cache.clear()
+    
+    def _letter_closing(self, job_data: Dict) -> str:
+        """
+        Closing the prompt asks the letter to end with, used as stop sequence.
+        
+        Args:
+            job_data: Job offer data
+            
+        Returns:
+            'Cordialement,' for French job descriptions, 'Sincerely,' otherwise
+        """
+        job_description = job_data.get('description', '') or job_data.get('description_text', '')
+        return LETTER_CLOSINGS['fr' if _is_french_description(job_description) else 'en']
+    
+    def _closing_suffix(self, letter: str, closing: str, finish_reason: Optional[str]) -> str:
+        """
+        Text that restores the closing cut off by the stop sequence.
+        
+        Args:
+            letter: Letter generated so far
+            closing: The stop sequence passed to Groq
+            finish_reason: finish_reason of the last streamed chunk
+            
+        Returns:
+            Closing to append, or '' when generation ended any other way
+        """
+        stripped = letter.rstrip()
+        # A truncated letter or one that already ends with a closing is left alone
+        if finish_reason != 'stop' or not stripped or stripped.endswith(','):
+            return ''
+        return closing if letter.endswith('\n') else '\n\n' + closing
+    
+    def _create_stream(self, messages: List[Dict[str, str]], quality: bool, closing: str):
+        """
+        Start a streamed completion on Groq, or on OpenAI if Groq is unavailable.
+        
+        Args:
+            messages: Chat messages to send
+            quality: Whether the caller asked for the higher-quality model
+            closing: Stop sequence ending the letter
+            
+        Returns:
+            Stream of chat completion chunks
+        """
+        params = dict(
+            messages=messages,
+            temperature=0.7,
+            max_tokens=self.max_tokens,
+            stop=[closing],
+            stream=True,
+        )
+        try:
+            return self.client.chat.completions.create(model=self._pick_model(messages, quality), **params)
+        except Exception as e:
+            fallback_client = self.fallback_client if _is_groq_unavailable(e) else None
+            if fallback_client is None:
+                raise
+            logger.warning(f"Groq unavailable ({str(e)}), falling back to OpenAI {self.fallback_model}")
+            return fallback_client.chat.completions.create(model=self.fallback_model, **params)
+    
+    async def _create_stream_async(
+        self,
+        clients: Tuple,
+        messages: List[Dict[str, str]],
+        quality: bool,
+        closing: str
+    ):
+        """
+        Async version of _create_stream.
+        
+        Args:
+            clients: (AsyncGroq, AsyncOpenAI or None) pair from _async_clients
+            messages: Chat messages to send
+            quality: Whether the caller asked for the higher-quality model
+            closing: Stop sequence ending the letter
+            
+        Returns:
+            Async stream of chat completion chunks
+        """
+        params = dict(
+            messages=messages,
+            temperature=0.7,
+            max_tokens=self.max_tokens,
+            stop=[closing],
+            stream=True,
+        )
+        try:
+            return await clients[0].chat.completions.create(model=self._pick_model(messages, quality), **params)
+        except Exception as e:
+            fallback_client = clients[1] if _is_groq_unavailable(e) else None
+            if fallback_client is None:
+                raise
+            logger.warning(f"Groq unavailable ({str(e)}), falling back to OpenAI {self.fallback_model}")
+            return await fallback_client.chat.completions.create(model=self.fallback_model, **params)
+    
+    def _pick_model(self, messages: List[Dict[str, str]], quality: bool = False) -> str:
+        """
+        Choose the Groq model for a request.
+        
+        Args:
+            messages: Chat messages that will be sent
+            quality: Whether the caller asked for the higher-quality model
+            
+        Returns:
+            Model name
+        """
+        if quality or sum(len(message["content"]) for message in messages) > QUALITY_PROMPT_THRESHOLD:
+            return self.quality_model
+        return self.model
+    
+    def generate_cover_letter(
+        self,
+        cv_data: Dict,
+        job_data: Dict,
+        custom_message: str = "",
+        quality: bool = False
+    ) -> str:
+        """
+        Generate an ultra-targeted cover letter using Groq LLM.
+        
+        Args:
+            cv_data: Parsed CV data with structured information
+            job_data: Job offer data
+            custom_message: Optional custom message to include
+            quality: Use the higher-quality (slower) model
+            
+        Returns:
+            Generated cover letter text
+        """
+        cover_letter = io.StringIO()
+        for part in self.generate_cover_letter_stream(cv_data, job_data, custom_message, quality):
+            cover_letter.write(part)
+        return cover_letter.getvalue()
+    
+    def generate_cover_letter_stream(
+        self,
+        cv_data: Dict,
+        job_data: Dict,
+        custom_message: str = "",
+        quality: bool = False
+    ) -> Iterator[str]:
+        """
+        Generate a cover letter, yielding normalized text as the LLM produces it.
+        
+        Args:
+            cv_data: Parsed CV data with structured information
+            job_data: Job offer data
+            custom_message: Optional custom message to include
+            quality: Use the higher-quality (slower) model
+            
+        Yields:
+            Successive pieces of the cover letter text
+        """
+        cache_key = self._letter_cache_key(cv_data, job_data, custom_message, quality)
+        cached = self._get_cached_letter(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        messages = self._build_messages(cv_data, job_data, custom_message)
+        closing = self._letter_closing(job_data)
+        
+        # Call Groq API with enhanced prompt
+        try:
+            stream = self._create_stream(messages, quality, closing)
+            
+            # Normalize text for PDF compatibility as chunks arrive; the
+            # normalization is per character so chunk boundaries don't matter
+            cover_letter = io.StringIO()
+            finish_reason = None
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    normalized = self._normalize_text_for_pdf(delta)
+                    if normalized:
+                        cover_letter.write(normalized)
+                        yield normalized
+            
+            suffix = self._closing_suffix(cover_letter.getvalue(), closing, finish_reason)
+            if suffix:
+                cover_letter.write(suffix)
+                yield suffix
+            
+            self._store_letter(cache_key, cover_letter.getvalue())
+            
+        except Exception as e:
+            raise Exception(f"Error generating cover letter with Groq: {str(e)}")
+    
+    async def generate_cover_letter_async(
+        self,
+        cv_data: Dict,
+        job_data: Dict,
+        custom_message: str = "",
+        quality: bool = False,
+        clients: Optional[Tuple] = None
+    ) -> str:
+        """
+        Async version of generate_cover_letter using the AsyncGroq client.
+        
+        Args:
+            cv_data: Parsed CV data with structured information
+            job_data: Job offer data
+            custom_message: Optional custom message to include
+            quality: Use the higher-quality (slower) model
+            clients: Clients from _async_clients to reuse; opened (and closed)
+                for this letter alone when omitted
+            
+        Returns:
+            Generated cover letter text
+        """
+        cache_key = self._letter_cache_key(cv_data, job_data, custom_message, quality)
+        cached = self._get_cached_letter(cache_key)
+        if cached is not None:
+            return cached
+        
+        messages = self._build_messages(cv_data, job_data, custom_message)
+        closing = self._letter_closing(job_data)
+        
+        if clients is None:
+            async with self._async_clients() as clients:
+                return await self._agenerate_letter(clients, messages, quality, closing, cache_key)
+        return await self._agenerate_letter(clients, messages, quality, closing, cache_key)
+    
+    async def _agenerate_letter(
+        self,
+        clients: Tuple,
+        messages: List[Dict[str, str]],
+        quality: bool,
+        closing: str,
+        cache_key: str
+    ) -> str:
+        """Stream one letter with the given clients, normalize it and cache it."""
+        try:
+            stream = await self._create_stream_async(clients, messages, quality, closing)
+            
+            cover_letter = io.StringIO()
+            finish_reason = None
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    cover_letter.write(self._normalize_text_for_pdf(delta))
+            
+            letter = cover_letter.getvalue()
+            letter += self._closing_suffix(letter, closing, finish_reason)
+            self._store_letter(cache_key, letter)
+            return letter
+            
+        except Exception as e:
+            raise Exception(f"Error generating cover letter with Groq: {str(e)}")
+    
+    async def generate_many(
+        self,
+        pairs: List[Tuple[Dict, Dict]],
+        custom_message: str = "",
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> List[Union[str, Exception]]:
+        """
+        Generate cover letters for several (cv_data, job_data) pairs concurrently.
+        
+        Args:
+            pairs: List of (cv_data, job_data) tuples
+            custom_message: Optional custom message to include in every letter
+            concurrency: Maximum number of Groq requests in flight at once
+            
+        Returns:
+            Cover letter text or the raised exception, in the order of pairs
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with self._async_clients() as clients:
+            async def generate(cv_data: Dict, job_data: Dict) -> str:
+                async with semaphore:
+                    return await self.generate_cover_letter_async(
+                        cv_data, job_data, custom_message, clients=clients
+                    )
+            
+            return await asyncio.gather(
+                *(generate(cv_data, job_data) for cv_data, job_data in pairs),
+                return_exceptions=True
+            )
+    
+    async def generate_cover_letters_batch(
+        self,
+        cv_data: Dict,
+        jobs: List[Dict],
+        custom_message: str = "",
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> List[Union[str, Exception]]:
         """
-        Extract skills from CV data.
+        Generate cover letters for one CV and several job offers concurrently.
         
         Args:
-            cv_data: Parsed CV data
+            cv_data: Parsed CV data with structured information
+            jobs: List of job offer data
+            custom_message: Optional custom message to include in every letter
+            concurrency: Maximum number of Groq requests in flight at once
             
         Returns:
-            List of skills
+            Cover letter text or the raised exception, in the order of jobs
         """
-        skills = cv_data.get('skills', [])
-        return [skill.strip() for skill in skills if skill.strip()]
+        return await self.generate_many(
+            [(cv_data, job_data) for job_data in jobs],
+            custom_message=custom_message,
+            concurrency=concurrency
+        )
     
-    def _extract_job_requirements(self, job_data: Dict) -> List[str]:
+    def generate_cover_letters(
+        self,
+        cv_data: Dict,
+        jobs: List[Dict],
+        custom_message: str = ""
+    ) -> List[Union[str, Exception]]:
         """
-        Extract requirements from job data.
+        Synchronous wrapper around generate_cover_letters_batch.
         
         Args:
-            job_data: Job offer data
+            cv_data: Parsed CV data with structured information
+            jobs: List of job offer data
+            custom_message: Optional custom message to include in every letter
             
         Returns:
-            List of requirements
+            Cover letter text or the raised exception, in the order of jobs
         """
-        requirements = job_data.get('requirements', [])
-        
-        # Also extract from description if available
-        description = job_data.get('description', '') or job_data.get('description_text', '')
+        return run_sync(self.generate_cover_letters_batch(cv_data, jobs, custom_message))
+    
+    def submit_cover_letter_batch_job(
+        self,
+        pairs: List[Tuple[Dict, Dict]],
+        custom_message: str = "",
+        quality: bool = False
+    ) -> str:
+        """
+        Queue cover letters for many (cv_data, job_data) pairs on Groq's batch API.
         
-        # If no explicit requirements, extract from description
-        if not requirements and description:
-            # Look for requirement patterns in description
-            # Split on common separators and patterns
-            req_patterns = re.split(r'[;,]\s*(?=[A-Z])|Requirements:\s*|Qualifications:\s*', description)
-            requirements = [req.strip() for req in req_patterns if req.strip() and len(req.strip()) > 10]
+        Batch jobs are billed at a discount but complete asynchronously (within
+        BATCH_COMPLETION_WINDOW), so this suits bulk applications prepared ahead
+        of time; use generate_many when the letters are needed right away.
         
-        # Combine requirements
-        all_requirements = list(requirements) if requirements else []
+        Args:
+            pairs: List of (cv_data, job_data) tuples
+            custom_message: Optional custom message to include in every letter
+            quality: Use the higher-quality (slower) model
+            
+        Returns:
+            Batch job id, to pass to fetch_cover_letter_batch_job
+        """
+        lines = []
+        for index, (cv_data, job_data) in enumerate(pairs):
+            messages = self._build_messages(cv_data, job_data, custom_message)
+            closing = self._letter_closing(job_data)
+            language = 'fr' if closing == LETTER_CLOSINGS['fr'] else 'en'
+            lines.append(json.dumps({
+                # The closing is needed again when the letter comes back
+                "custom_id": f"letter-{index}-{language}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self._pick_model(messages, quality),
+                    "messages": messages,
+                    "temperature": 0.7,
+                    "max_tokens": self.max_tokens,
+                    "stop": [closing],
+                },
+            }, ensure_ascii=False))
         
-        return [req.strip() for req in all_requirements if req.strip()]
+        try:
+            input_file = self.client.files.create(
+                file=("cover_letters.jsonl", "\n".join(lines).encode('utf-8')),
+                purpose="batch"
+            )
+            batch = self.client.batches.create(
+                completion_window=BATCH_COMPLETION_WINDOW,
+                endpoint="/v1/chat/completions",
+                input_file_id=input_file.id
+            )
+        except Exception as e:
+            raise Exception(f"Error submitting cover letter batch to Groq: {str(e)}")
+        return batch.id
     
-    def _match_skills(self, cv_data: Dict, job_data: Dict) -> List[Tuple[str, str]]:
+    def fetch_cover_letter_batch_job(
+        self,
+        batch_id: str,
+        count: int
+    ) -> Optional[List[Union[str, Exception]]]:
         """
-        Match candidate skills with job requirements.
+        Collect the letters of a batch job queued by submit_cover_letter_batch_job.
         
         Args:
-            cv_data: Parsed CV data
-            job_data: Job offer data
+            batch_id: Id returned by submit_cover_letter_batch_job
+            count: Number of pairs that were submitted
             
         Returns:
-            List of tuples (candidate_skill, matched_requirement)
+            Cover letter text or an exception per pair, in submission order, or
+            None while the job is still running
+            
+        Raises:
+            Exception: If the batch job failed, expired or was cancelled
         """
-        cv_skills = self._extract_skills(cv_data)
-        job_requirements = self._extract_job_requirements(job_data)
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in BATCH_FAILED_STATUSES:
+            raise Exception(f"Groq cover letter batch {batch_id} ended with status '{batch.status}'")
+        if batch.status != 'completed':
+            return None
         
-        # Extract potential skill keywords from job description (more conservative)
-        description = job_data.get('description', '') or job_data.get('description_text', '')
-        if description:
-            # Look for capitalized words, tech terms, or words with numbers/special chars
-            tech_words = re.findall(r'\b[A-Z][a-z]*(?:[A-Z][a-z]*)*\b|[a-z]+\+\+|[a-z]+\.js|[a-z]+[0-9]', description)
-            job_requirements.extend([w for w in tech_words if len(w) > 3])
-        
-        # Find matches using word boundary matching to avoid false positives
-        matched = []
-        cv_skills_lower = [s.lower() for s in cv_skills]
-        
-        for cv_skill in cv_skills:
-            cv_skill_lower = cv_skill.lower()
-            for job_req in job_requirements:
-                job_req_lower = job_req.lower()
-                # Exact match or skill as complete word in requirement
-                if cv_skill_lower == job_req_lower or (cv_skill_lower in job_req_lower and len(cv_skill_lower) > 3):
-                    matched.append((cv_skill, job_req))
-                    break
-                elif job_req_lower in cv_skill_lower and len(job_req_lower) > 3:
-                    matched.append((cv_skill, job_req))
-                    break
-        
-        return matched[:10]  # Return top matches
+        results: List[Union[str, Exception]] = [
+            Exception("No result returned for this cover letter") for _ in range(count)
+        ]
+        for file_id in (batch.error_file_id, batch.output_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text().splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                _, index, language = record["custom_id"].split("-")
+                index = int(index)
+                if not 0 <= index < count:
+                    continue
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    error = record.get("error") or response.get("body")
+                    results[index] = Exception(f"Error generating cover letter with Groq: {error}")
+                    continue
+                choice = response["body"]["choices"][0]
+                letter = self._normalize_text_for_pdf(choice["message"]["content"] or "")
+                results[index] = letter + self._closing_suffix(
+                    letter, LETTER_CLOSINGS[language], choice.get("finish_reason")
+                )
+        return results
     
-    def _extract_candidate_info(self, cv_data: Dict) -> Dict:
+    def get_skill_match_report(self, cv_data: Dict, job_data: Dict) -> Dict:
         """
-        Extract comprehensive candidate information from CV data.
+        Generate a skill match report.
         
         Args:
             cv_data: Parsed CV data
+            job_data: Job offer data
             
         Returns:
-            Dictionary with candidate information
+            Dictionary with skill match analysis
         """
-        raw_text = cv_data.get('raw_text', '')
-        
-        # Extract experiences with more detail
-        experiences = []
-        exp_data = cv_data.get('experience', [])
-        for exp in exp_data[:5]:
-            if isinstance(exp, dict):
-                title = exp.get('title', '')
-                company = exp.get('company', '')
-                responsibilities = exp.get('responsibilities', [])
-                
-                if isinstance(responsibilities, list):
-                    resp_text = '; '.join(responsibilities[:2])
-                else:
-                    resp_text = str(responsibilities)[:MAX_RESPONSIBILITY_LENGTH]
-                
-                if title and company:
-                    exp_str = f"{title} at {company}"
-                    if resp_text:
-                        exp_str += f" - {resp_text}"
-                    experiences.append(exp_str)
-        
-        # Extract formations/education
-        formations = []
-        edu_data = cv_data.get('education', [])
-        for edu in edu_data[:3]:
-            if isinstance(edu, dict):
-                degree = edu.get('degree', '')
-                institution = edu.get('institution', '')
-                if degree:
-                    formations.append(f"{degree}" + (f" - {institution}" if institution else ""))
-        
-        # Extract certifications from raw text or structured data
-        certifications = cv_data.get('certifications', [])
-        if isinstance(certifications, list):
-            certifications = [str(cert) for cert in certifications[:5]]
-        
-        return {
-            'name': cv_data.get('name', 'Candidate'),
-            'email': cv_data.get('email', ''),
-            'phone': cv_data.get('phone', ''),
-            'skills': self._extract_skills(cv_data),
-            'experiences': experiences,
-            'formations': formations,
-            'certifications': certifications
-        }
+        job_requirements = self._extract_job_requirements(job_data)
+        skill_matches = self._match_skills(cv_data, job_data, job_requirements)
+        return self._build_skill_match_report(job_requirements, skill_matches)
     
-    def _normalize_text_for_pdf(self, text: str) -> str:
+    def batch_match(self, cv_data: Dict, jobs: List[Dict]) -> List[List[Tuple[str, str]]]:
         """
-        Normalize text for PDF compatibility.
-        Replaces problematic characters with ASCII equivalents.
+        Match one CV against many job offers.
         
         Args:
-            text: Input text
+            cv_data: Parsed CV data
+            jobs: List of job offer data
             
         Returns:
-            Normalized text safe for PDF
+            For each job, the list of (candidate_skill, matched_requirement) tuples
+            that _match_skills would return
         """
-        # Replace smart quotes with regular quotes
-        text = text.replace('"', '"').replace('"', '"')
-        text = text.replace(''', "'").replace(''', "'")
-        
-        # Replace em/en dashes with regular dashes
-        text = text.replace('—', '-').replace('–', '-')
-        
-        # Replace common accented characters with ASCII equivalents
-        replacements = {
-            'é': 'e', 'è': 'e', 'ê': 'e', 'ë': 'e',
-            'à': 'a', 'â': 'a', 'ä': 'a',
-            'ô': 'o', 'ö': 'o',
-            'ù': 'u', 'û': 'u', 'ü': 'u',
-            'î': 'i', 'ï': 'i',
-            'ç': 'c',
-            'É': 'E', 'È': 'E', 'Ê': 'E', 'Ë': 'E',
-            'À': 'A', 'Â': 'A', 'Ä': 'A',
-            'Ô': 'O', 'Ö': 'O',
-            'Ù': 'U', 'Û': 'U', 'Ü': 'U',
-            'Î': 'I', 'Ï': 'I',
-            'Ç': 'C',
-        }
-        
-        for char, replacement in replacements.items():
-            text = text.replace(char, replacement)
+        cv_skills = self._extract_skills(cv_data)
+        if ahocorasick is None or not cv_skills or not jobs:
+            return [self._match_skills(cv_data, job_data) for job_data in jobs]
         
-        # Remove any remaining non-ASCII (last resort)
-        text = text.encode('ascii', 'ignore').decode('ascii')
+        jobs_terms = [
+            _match_terms(
+                tuple(self._extract_job_requirements(job_data)),
+                job_data.get('description', '') or job_data.get('description_text', '')
+            )
+            for job_data in jobs
+        ]
+        first = _batch_first_matches(
+            [skill.lower() for skill in cv_skills],
+            [[term.lower() for term in terms] for terms in jobs_terms]
+        )
         
-        return text
+        results = []
+        for terms, job_first in zip(jobs_terms, first.tolist()):
+            matched = [
+                (cv_skill, terms[term_index])
+                for cv_skill, term_index in zip(cv_skills, job_first)
+                if term_index >= 0
+            ]
+            results.append(_top_matches(matched))
+        return results
     
-    def generate_cover_letter(
-        self,
-        cv_data: Dict,
-        job_data: Dict,
-        custom_message: str = ""
-    ) -> str:
+    def get_skill_match_reports(self, cv_data: Dict, jobs: List[Dict]) -> List[Dict]:
         """
-        Generate an ultra-targeted cover letter using Groq LLM.
+        Generate skill match reports for one CV against many job offers.
         
         Args:
-            cv_data: Parsed CV data with structured information
-            job_data: Job offer data
-            custom_message: Optional custom message to include
+            cv_data: Parsed CV data
+            jobs: List of job offer data
             
         Returns:
-            Generated cover letter text
+            One get_skill_match_report dictionary per job, in order
         """
-        # Extract comprehensive candidate information
-        candidate_info = self._extract_candidate_info(cv_data)
-        
-        # Extract job information
-        job_title = job_data.get('title', 'the position')
-        company = job_data.get('company') or job_data.get('organization', 'your company')
-        location = job_data.get('location', '')
-        job_description = job_data.get('description', '') or job_data.get('description_text', '')
-        job_requirements = self._extract_job_requirements(job_data)
-        
-        # Perform skill matching
-        skill_matches = self._match_skills(cv_data, job_data)
-        
-        # Detect language from job description
-        is_french = any(word in job_description.lower() for word in ['développement', 'expérience', 'équipe', 'nous recherchons'])
-        
-        # Build the enhanced prompt with skill matching
-        if is_french:
-            prompt = f"""MISSION : Redige une lettre de motivation ULTRA-CIBLEE pour ce match job/candidat.
-
-=== OFFRE D'EMPLOI ===
-Poste : {job_title}
-Entreprise : {company}
-Localisation : {location if location else 'Not specified'}
-Description : {job_description[:600]}
-Exigences cles :
-{chr(10).join([f"- {req}" for req in job_requirements[:7]])}
-
-=== PROFIL CANDIDAT : {candidate_info['name']} ===
-Contact : {candidate_info['email']} | {candidate_info['phone']}
-
-Stack technique :
-{', '.join(candidate_info['skills'][:15])}
-
-Experience professionnelle :
-{chr(10).join([f"- {exp}" for exp in candidate_info['experiences'][:5]])}
-
-Formation :
-{chr(10).join([f"- {form}" for form in candidate_info['formations'][:3]])}
-
-Certifications :
-{chr(10).join([f"- {cert}" for cert in candidate_info['certifications'][:3]])}
-
-=== COMPETENCES QUI MATCHENT ===
-{chr(10).join([f"- Candidat a '{match[0]}' => Requis '{match[1]}'" for match in skill_matches[:5]]) if skill_matches else "Identifier les transferable skills"}
-
-=== STRUCTURE OBLIGATOIRE (280 mots MAX) ===
-
-PARAGRAPHE 1 - ACCROCHE CIBLEE (3-4 lignes)
-Commence par UNE competence ou realisation concrete qui matche l'offre.
-Exemple : 'Developper des APIs RESTful avec {candidate_info['skills'][0] if candidate_info['skills'] else 'Python'} qui gerent 50K requetes/jour, c'est ce que je fais actuellement.'
-Enchaine sur pourquoi {company} et ce poste specifiquement.
-
-PARAGRAPHE 2 - PREUVES CONCRETES (5-6 lignes)
-Cite 2-3 experiences/projets qui correspondent aux exigences du poste.
-Format : [Projet/Experience] + [Technologies utilisees] + [Resultat/Impact]
-Privilegie les experiences avec les technologies matchees.
-Utilise les VRAIES experiences du candidat listees ci-dessus.
-
-PARAGRAPHE 3 - FIT & VALEUR AJOUTEE (4-5 lignes)
-Explique pourquoi tu es le bon match pour {company}.
-Mentionne la formation si pertinent pour le poste.
-Mets en avant la capacite d'apprentissage et les certifications.
-Ce que tu apportes : competences techniques + mindset professionnel.
-
-PARAGRAPHE 4 - CLOSING PRO (2 lignes)
-'Je serais ravi d'echanger sur comment mes competences peuvent contribuer a [projet/mission de l'entreprise].'
-'Disponible pour un entretien a votre convenance.'
-Termine par 'Cordialement,' UNIQUEMENT.
-
-{f"CUSTOM MESSAGE TO INCORPORATE: {custom_message}" if custom_message else ""}
-
-=== REGLES D'OR ===
-- Utilise les VRAIES experiences du candidat (pas d'invention)
-- Adapte chaque phrase au poste vise
-- Mentionne des technologies/projets concrets
-- Phrases courtes : 15-20 mots max
-- ZERO cliche : 'dynamique', 'motive', 'passionne' = INTERDIT
-- Ton professionnel mais moderne (pas guinde)
-- Pas de signature finale (juste 'Cordialement,')
-
-GO ! Redige cette lettre maintenant."""
-            
-            system_message = (
-                "Tu es un expert en recrutement tech qui redige des lettres de motivation "
-                "sur mesure. Tu analyses le profil du candidat et l'offre d'emploi pour creer "
-                "un pitch parfait qui met en avant les competences pertinentes. "
-                "Style : direct, factuel, professionnel mais moderne. Zero bullshit."
-            )
-        else:
-            # English prompt
-            prompt = f"""MISSION: Write an ULTRA-TARGETED cover letter for this job/candidate match.
-
-=== JOB OFFER ===
-Position: {job_title}
-Company: {company}
-Location: {location if location else 'Not specified'}
-Description: {job_description[:600]}
-Key Requirements:
-{chr(10).join([f"- {req}" for req in job_requirements[:7]])}
-
-=== CANDIDATE PROFILE: {candidate_info['name']} ===
-Contact: {candidate_info['email']} | {candidate_info['phone']}
-
-Technical Stack:
-{', '.join(candidate_info['skills'][:15])}
-
-Professional Experience:
-{chr(10).join([f"- {exp}" for exp in candidate_info['experiences'][:5]])}
-
-Education:
-{chr(10).join([f"- {form}" for form in candidate_info['formations'][:3]])}
-
-Certifications:
-{chr(10).join([f"- {cert}" for cert in candidate_info['certifications'][:3]])}
-
-=== MATCHING SKILLS ===
-{chr(10).join([f"- Candidate has '{match[0]}' => Required '{match[1]}'" for match in skill_matches[:5]]) if skill_matches else "Identify transferable skills"}
-
-=== MANDATORY STRUCTURE (280 words MAX) ===
-
-PARAGRAPH 1 - TARGETED HOOK (3-4 lines)
-Start with ONE concrete skill or achievement matching the offer.
-Example: 'Building RESTful APIs with {candidate_info['skills'][0] if candidate_info['skills'] else 'Python'} handling 50K requests/day is what I do currently.'
-Connect to why {company} and this specific position.
-
-PARAGRAPH 2 - CONCRETE PROOF (5-6 lines)
-Cite 2-3 experiences/projects matching job requirements.
-Format: [Project/Experience] + [Technologies used] + [Result/Impact]
-Prioritize experiences with matched technologies.
-Use REAL candidate experiences listed above.
-
-PARAGRAPH 3 - FIT & VALUE ADD (4-5 lines)
-Explain why you're the right match for {company}.
-Mention education if relevant for the position.
-Highlight learning capacity and certifications.
-What you bring: technical skills + professional mindset.
-
-PARAGRAPH 4 - PROFESSIONAL CLOSING (2 lines)
-'I would be delighted to discuss how my skills can contribute to [company project/mission].'
-'Available for an interview at your convenience.'
-End with 'Sincerely,' ONLY.
-
-{f"CUSTOM MESSAGE TO INCORPORATE: {custom_message}" if custom_message else ""}
-
-=== GOLDEN RULES ===
-- Use REAL candidate experiences (no invention)
-- Adapt each sentence to target position
-- Mention concrete technologies/projects
-- Short sentences: 15-20 words max
-- ZERO cliches: 'dynamic', 'motivated', 'passionate' = FORBIDDEN
-- Professional but modern tone (not stiff)
-- No final signature (just 'Sincerely,')
-
-GO! Write this letter now."""
-            
-            system_message = (
-                "You are a tech recruitment expert who writes tailored cover letters. "
-                "You analyze the candidate's profile and job offer to create "
-                "a perfect pitch highlighting relevant skills. "
-                "Style: direct, factual, professional but modern. No bullshit."
-            )
-        
-        # Call Groq API with enhanced prompt
-        try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_message
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                model=self.model,  # Use configured model instead of hardcoding
-                temperature=0.7,
-                max_tokens=900,
-            )
-            
-            cover_letter = chat_completion.choices[0].message.content
-            
-            # Normalize text for PDF compatibility
-            cover_letter = self._normalize_text_for_pdf(cover_letter)
-            
-            return cover_letter
-            
-        except Exception as e:
-            raise Exception(f"Error generating cover letter with Groq: {str(e)}")
+        return [
+            self._build_skill_match_report(self._extract_job_requirements(job_data), skill_matches)
+            for job_data, skill_matches in zip(jobs, self.batch_match(cv_data, jobs))
+        ]
     
-    def get_skill_match_report(self, cv_data: Dict, job_data: Dict) -> Dict:
+    def _build_skill_match_report(
+        self,
+        job_requirements: List[str],
+        skill_matches: List[Tuple[str, str]]
+    ) -> Dict:
         """
-        Generate a skill match report.
+        Summarize skill matches into matched/missing skills and a percentage.
         
         Args:
-            cv_data: Parsed CV data
-            job_data: Job offer data
+            job_requirements: Requirements extracted from the job offer
+            skill_matches: Result of _match_skills for the same job
             
         Returns:
             Dictionary with skill match analysis
         """
-        skill_matches = self._match_skills(cv_data, job_data)
-        
         # Extract matched skills from tuples
         matched_skills = [match[0] for match in skill_matches]
         
         # Calculate match percentage based on job requirements
-        job_requirements = self._extract_job_requirements(job_data)
         total_requirements = len(job_requirements)
         
         # Find missing skills (job requirements not in matched skills)
-        missing_skills = []
-        matched_skills_lower = [s.lower() for s in matched_skills]
-        for req in job_requirements[:10]:
-            req_lower = req.lower()
-            found = False
-            for matched_skill in matched_skills_lower:
-                if matched_skill in req_lower or req_lower in matched_skill:
-                    found = True
-                    break
-            if not found:
-                missing_skills.append(req)
+        # At most 10 requirements against at most 10 deduplicated skills
+        matched_skills_lower = {s.lower() for s in matched_skills}
+        missing_skills = [
+            req for req, req_lower in zip(job_requirements, (r.lower() for r in job_requirements[:10]))
+            if not any(skill in req_lower or req_lower in skill for skill in matched_skills_lower)
+        ]
         
         if total_requirements > 0:
             match_percentage = (len(matched_skills) / total_requirements) * 100
@@ -466,18 +1636,29 @@ GO! Write this letter now."""
 
 # Singleton instance - initialized on first use
 _groq_cover_letter_service = None
+_groq_cover_letter_service_lock = threading.Lock()
 
 def get_groq_cover_letter_service():
     """Get or create the Groq cover letter service singleton."""
     global _groq_cover_letter_service
     if _groq_cover_letter_service is None:
-        _groq_cover_letter_service = GroqCoverLetterService()
+        with _groq_cover_letter_service_lock:
+            if _groq_cover_letter_service is None:
+                _groq_cover_letter_service = GroqCoverLetterService()
     return _groq_cover_letter_service
 
 # For backward compatibility
 class _GroqServiceProxy:
     """Proxy to lazily initialize the service."""
     def __getattr__(self, name):
-        return getattr(get_groq_cover_letter_service(), name)
+        # Dunder lookups (copy, pickle, introspection) must not create the service
+        if name.startswith('__'):
+            raise AttributeError(name)
+        value = getattr(get_groq_cover_letter_service(), name)
+        # Methods never change, so later lookups skip __getattr__ entirely;
+        # data attributes are always read from the service
+        if callable(value):
+            self.__dict__[name] = value
+        return value
 
 groq_cover_letter_service = _GroqServiceProxy()
@@ -1,17 +1,101 @@
-from typing import List
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List
 import numpy as np
 
+# Common words ignored by extract_keywords
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
+    'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'should', 'could', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'
+})
+
+class _OnnxSentenceEncoder:
+    """
+    MiniLM sentence encoder running on ONNX Runtime instead of PyTorch.
+    
+    Expects a directory produced by optimum, e.g.
+        optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 \\
+            --task feature-extraction onnx_minilm/
+    optionally int8-quantized with optimum-cli onnxruntime quantize (the
+    quantized model_quantized.onnx is preferred when present). Output matches
+    SentenceTransformer.encode: mean pooling followed by L2 normalization.
+    """
+    
+    # Same truncation as all-MiniLM-L6-v2's max_seq_length
+    MAX_LENGTH = 256
+    
+    def __init__(self, model_dir: str):
+        import onnxruntime
+        from transformers import AutoTokenizer
+        
+        model_path = os.path.join(model_dir, 'model_quantized.onnx')
+        if not os.path.exists(model_path):
+            model_path = os.path.join(model_dir, 'model.onnx')
+        
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            model_path, sess_options=options, providers=['CPUExecutionProvider']
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into L2-normalized sentence embeddings."""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        tokens = self.tokenizer(
+            list(texts), padding=True, truncation=True,
+            max_length=self.MAX_LENGTH, return_tensors='np'
+        )
+        inputs = {name: array.astype(np.int64) for name, array in tokens.items() if name in self.input_names}
+        token_embeddings = self.session.run(None, inputs)[0]
+        
+        # Mean pooling over real (non-padding) tokens
+        mask = tokens['attention_mask'][..., None].astype(np.float32)
+        embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return (embeddings / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
 class NLPService:
+    # Maximum number of model embeddings kept in memory, keyed by text
+    EMBEDDING_CACHE_SIZE = 2048
+    
     def __init__(self):
         # Using a lightweight model for sentence embeddings
         # Lazy load to avoid import issues
         self.model = None
         self._model_name = 'all-MiniLM-L6-v2'
+        
+        # Matching one CV against many jobs encodes the CV summary once per job;
+        # cache embeddings by text, least recently used first
+        self._embedding_cache = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
     
     def _load_model(self):
-        """Lazy load the sentence transformer model."""
+        """
+        Lazy load the sentence transformer model.
+        
+        When NLP_ONNX_MODEL_DIR points to an ONNX export of the model, it is
+        served with ONNX Runtime (faster on CPU, especially int8-quantized).
+        """
         if self.model is None:
+            onnx_model_dir = os.getenv('NLP_ONNX_MODEL_DIR')
+            if onnx_model_dir:
+                try:
+                    self.model = _OnnxSentenceEncoder(onnx_model_dir)
+                    return
+                except Exception as e:
+                    print(f"Warning: Could not load ONNX model from {onnx_model_dir}: {e}")
+                    print("Using sentence transformer model")
             try:
+                self._configure_torch_threads()
                 from sentence_transformers import SentenceTransformer
                 self.model = SentenceTransformer(self._model_name)
             except Exception as e:
@@ -19,6 +103,34 @@ class NLPService:
                 print("Using fallback similarity calculation")
                 self.model = False  # Mark as failed to load
     
+    def _configure_torch_threads(self):
+        """
+        Limit PyTorch's thread pools before the model is loaded.
+        
+        By default PyTorch uses every core for each encode, which oversubscribes
+        the CPU when several requests (or uvicorn workers) encode at once. Uses
+        NLP_NUM_THREADS, or half the cores.
+        """
+        import torch
+        
+        num_threads = int(os.getenv('NLP_NUM_THREADS', '0')) or max(1, (os.cpu_count() or 2) // 2)
+        torch.set_num_threads(num_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Can only be set before any inter-op parallel work has started
+            pass
+    
+    def warm_up(self):
+        """
+        Load the model and run one encode, so the first request doesn't pay for it.
+        
+        Called at application startup when NLP_EAGER_LOAD is set.
+        """
+        self._load_model()
+        if self.model:
+            self.model.encode(['warm up'])
+    
     def get_embeddings(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for a list of texts.
@@ -32,32 +144,67 @@ class NLPService:
         self._load_model()
         
         if self.model and self.model is not False:
-            return self.model.encode(texts)
+            return self._encode_cached(texts)
         else:
             # Fallback: simple bag-of-words representation
             return self._simple_embeddings(texts)
     
+    def _encode_cached(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts with the model, reusing cached embeddings.
+        
+        Texts not in the cache are encoded together in one model call.
+        
+        Args:
+            texts: List of text strings
+            
+        Returns:
+            numpy array of embeddings, one row per text
+        """
+        if not texts:
+            return self.model.encode(texts)
+        
+        embeddings = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        with self._embedding_cache_lock:
+            for i, text in enumerate(texts):
+                embedding = self._embedding_cache.get(text)
+                if embedding is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    self._embedding_cache.move_to_end(text)
+                    embeddings[i] = embedding
+        
+        if missing:
+            encoded = self.model.encode(list(missing))
+            with self._embedding_cache_lock:
+                for text, embedding in zip(missing, encoded):
+                    # Cached rows are shared between callers
+                    embedding = np.asarray(embedding, dtype=np.float32)
+                    embedding.setflags(write=False)
+                    self._embedding_cache[text] = embedding
+                    for i in missing[text]:
+                        embeddings[i] = embedding
+                while len(self._embedding_cache) > self.EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
+        
+        return np.stack(embeddings)
+    
     def _simple_embeddings(self, texts: List[str]) -> np.ndarray:
         """Simple fallback embedding using word presence."""
-        # Create a simple vocabulary from all texts
-        all_words = set()
-        for text in texts:
-            all_words.update(text.lower().split())
+        # Tokenize each text once; only word presence matters
+        token_sets = [set(text.lower().split()) for text in texts]
         
-        vocab = sorted(list(all_words))
+        # Create a simple vocabulary from all texts
+        vocab = sorted(set().union(*token_sets))
         vocab_index = {word: i for i, word in enumerate(vocab)}
         
         # Create embeddings
-        embeddings = []
-        for text in texts:
-            words = text.lower().split()
-            vec = np.zeros(len(vocab))
-            for word in words:
-                if word in vocab_index:
-                    vec[vocab_index[word]] = 1
-            embeddings.append(vec)
-        
-        return np.array(embeddings)
+        embeddings = np.zeros((len(texts), len(vocab)))
+        for row, tokens in zip(embeddings, token_sets):
+            row[[vocab_index[word] for word in tokens]] = 1
+        
+        return embeddings
     
     def compute_similarity(self, text1: str, text2: str) -> float:
         """
@@ -70,18 +217,66 @@ class NLPService:
         Returns:
             Similarity score between 0 and 1
         """
-        embeddings = self.get_embeddings([text1, text2])
+        return float(self.compute_similarity_matrix([text1], [text2])[0, 0])
+    
+    def compute_similarity_matrix(self, texts_a: List[str], texts_b: List[str]) -> np.ndarray:
+        """
+        Compute cosine similarity between every text of texts_a and of texts_b.
         
-        # Compute cosine similarity
-        norm1 = np.linalg.norm(embeddings[0])
-        norm2 = np.linalg.norm(embeddings[1])
+        All texts are embedded in one call, and the similarities come from a
+        single product of the L2-normalized embedding matrices.
         
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
+        Args:
+            texts_a: First list of text strings
+            texts_b: Second list of text strings
+            
+        Returns:
+            (len(texts_a) x len(texts_b)) array of scores between 0 and 1
+        """
+        if not texts_a or not texts_b:
+            return np.zeros((len(texts_a), len(texts_b)))
         
-        similarity = np.dot(embeddings[0], embeddings[1]) / (norm1 * norm2)
+        self._load_model()
+        if not self.model:
+            return self._simple_similarity_matrix(texts_a, texts_b)
         
-        return float(max(0.0, min(1.0, similarity)))  # Clamp between 0 and 1
+        embeddings = np.asarray(self.get_embeddings(list(texts_a) + list(texts_b)), dtype=np.float64)
+        
+        # Zero vectors stay zero, so their similarity is 0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.clip(norms, 1e-12, None)
+        
+        similarity = embeddings[:len(texts_a)] @ embeddings[len(texts_a):].T
+        return np.clip(similarity, 0.0, 1.0)  # Clamp between 0 and 1
+    
+    def _simple_similarity_matrix(self, texts_a: List[str], texts_b: List[str]) -> np.ndarray:
+        """
+        Cosine similarity of the _simple_embeddings vectors, without building them.
+        
+        For word-presence vectors the dot product is the number of shared words
+        and each norm is the square root of the number of distinct words, so the
+        dense (texts x vocabulary) matrix is never needed.
+        
+        Args:
+            texts_a: First list of text strings
+            texts_b: Second list of text strings
+            
+        Returns:
+            (len(texts_a) x len(texts_b)) array of scores between 0 and 1
+        """
+        token_sets_a = [set(text.lower().split()) for text in texts_a]
+        token_sets_b = [set(text.lower().split()) for text in texts_b]
+        
+        shared = np.array(
+            [[len(tokens_a & tokens_b) for tokens_b in token_sets_b] for tokens_a in token_sets_a],
+            dtype=np.float64
+        ).reshape(len(texts_a), len(texts_b))
+        sizes_a = np.array([len(tokens) for tokens in token_sets_a], dtype=np.float64)
+        sizes_b = np.array([len(tokens) for tokens in token_sets_b], dtype=np.float64)
+        
+        # Empty texts have no words in common with anything, so their score is 0
+        norms = np.sqrt(np.outer(sizes_a, sizes_b))
+        return np.clip(shared / np.clip(norms, 1.0, None), 0.0, 1.0)
     
     def extract_keywords(self, text: str, top_n: int = 10) -> List[str]:
         """
@@ -96,27 +291,10 @@ class NLPService:
         """
         # Simple keyword extraction based on word frequency
         words = text.lower().split()
+        word_freq = Counter(w for w in words if len(w) > 3 and w not in STOP_WORDS)
         
-        # Filter out common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
-            'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-            'should', 'could', 'may', 'might', 'must', 'can', 'this', 'that',
-            'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'
-        }
-        
-        filtered_words = [w for w in words if w not in stop_words and len(w) > 3]
-        
-        # Count frequency
-        word_freq = {}
-        for word in filtered_words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Sort by frequency and return top N
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        
-        return [word for word, _ in sorted_words[:top_n]]
+        # Most frequent first; ties keep their order of first appearance
+        return [word for word, _ in word_freq.most_common(top_n)]
 
 # Singleton instance
 nlp_service = NLPService()
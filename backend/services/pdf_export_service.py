@@ -3,14 +3,26 @@ PDF Export Service for Cover Letters.
 Creates modern, ATS-friendly PDF documents from cover letter text.
 """
 
+import io
+import multiprocessing
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import BinaryIO, Dict, List, Optional, Union
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.enums import TA_LEFT, TA_JUSTIFY
+from services.utils import strip_filename_chars
+
+# Worker processes take a fraction of a second to start while one letter lays
+# out in milliseconds, so smaller batches are exported in-process
+PARALLEL_EXPORT_MIN_LETTERS = 32
+
+# Greeting/closing words; paragraphs containing one use the Salutation style
+SALUTATION_PATTERN = re.compile(r'\b(?:dear|sincerely|regards|best)\b', re.IGNORECASE)
 
 
 class PDFExportService:
@@ -27,6 +39,17 @@ class PDFExportService:
             "exports"
         )
         os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Style sheet built on first export and reused (it is only read)
+        self._styles = None
+    
+    @property
+    def styles(self):
+        """Styles used for every export, created on first use."""
+        if self._styles is None:
+            # Concurrent first exports may both build it; either result is fine
+            self._styles = self._create_styles()
+        return self._styles
     
     def _create_styles(self):
         """
@@ -96,8 +119,8 @@ class PDFExportService:
         """
         # Generate filename if not provided
         if not filename:
-            safe_company = "".join(c for c in company if c.isalnum() or c in (' ', '-', '_')).strip()
-            safe_job = "".join(c for c in job_title if c.isalnum() or c in (' ', '-', '_')).strip()
+            safe_company = strip_filename_chars(company)
+            safe_job = strip_filename_chars(job_title)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"CoverLetter_{safe_company}_{safe_job}_{timestamp}"
         
@@ -106,10 +129,35 @@ class PDFExportService:
             filename += '.pdf'
         
         filepath = os.path.join(self.output_dir, filename)
+        self._build(filepath, cover_letter_text)
+        
+        return filepath
+    
+    def export_to_bytes(self, cover_letter_text: str) -> bytes:
+        """
+        Render a cover letter to PDF in memory, without touching the disk.
+        
+        Args:
+            cover_letter_text: The cover letter content
+            
+        Returns:
+            PDF document bytes
+        """
+        buffer = io.BytesIO()
+        self._build(buffer, cover_letter_text)
+        return buffer.getvalue()
+    
+    def _build(self, target: Union[str, BinaryIO], cover_letter_text: str):
+        """
+        Lay out a cover letter and write the PDF to target.
         
+        Args:
+            target: File path or binary file-like object
+            cover_letter_text: The cover letter content
+        """
         # Create PDF document
         doc = SimpleDocTemplate(
-            filepath,
+            target,
             pagesize=letter,
             rightMargin=0.75*inch,
             leftMargin=0.75*inch,
@@ -118,7 +166,7 @@ class PDFExportService:
         )
         
         # Get styles
-        styles = self._create_styles()
+        styles = self.styles
         
         # Build document content
         story = []
@@ -134,7 +182,7 @@ class PDFExportService:
             para_text = para_text.strip().replace('\n', ' ')
             
             # Determine style based on content
-            if any(keyword in para_text.lower() for keyword in ['dear', 'sincerely', 'regards', 'best']):
+            if SALUTATION_PATTERN.search(para_text):
                 style = styles['Salutation']
             else:
                 style = styles['BodyText']
@@ -146,8 +194,29 @@ class PDFExportService:
         
         # Build PDF
         doc.build(story)
+    
+    def export_many(self, letters: List[Dict], max_workers: Optional[int] = None) -> List[str]:
+        """
+        Export several cover letters to PDF, spreading the work over processes.
         
-        return filepath
+        ReportLab layout is pure Python and CPU-bound, so threads would contend
+        for the GIL; worker processes scale with the cores instead.
+        
+        Args:
+            letters: One dict of export_to_pdf keyword arguments per letter
+            max_workers: Maximum number of worker processes (default: CPU count)
+            
+        Returns:
+            Paths to the generated PDF files, in the order of letters
+        """
+        workers = min(max_workers or os.cpu_count() or 1, len(letters))
+        if workers < 2 or len(letters) < PARALLEL_EXPORT_MIN_LETTERS:
+            return [self.export_to_pdf(**letter_kwargs) for letter_kwargs in letters]
+        
+        # Spawn rather than fork: the server process runs threads, and forking
+        # a threaded process can deadlock the child
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            return list(executor.map(_export_in_worker, [self.output_dir] * len(letters), letters))
     
     def export_with_metadata(
         self,
@@ -183,3 +252,9 @@ class PDFExportService:
 
 # Singleton instance
 pdf_export_service = PDFExportService()
+
+
+def _export_in_worker(output_dir: str, letter_kwargs: Dict) -> str:
+    """Export one letter in a worker process of PDFExportService.export_many."""
+    pdf_export_service.output_dir = output_dir
+    return pdf_export_service.export_to_pdf(**letter_kwargs)
@@ -1,46 +1,251 @@
+import asyncio
+import concurrent.futures
+import functools
 import json
+import logging
+import mmap
+import multiprocessing
 import os
 import mimetypes
-from typing import Any, Dict, List
-from datetime import datetime
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import Any, Callable, Dict, List, Optional, Union
+from datetime import date
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    # Fall back to the stdlib json module if orjson is not installed
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Below this many files, extract_text_batch stays in-process
+PARALLEL_EXTRACT_MIN_FILES = 8
+
+# Match score weights: NLP similarity (70%), skill overlap (20%) and a flat
+# experience bonus (10%)
+MATCH_SIMILARITY_WEIGHT = 70
+MATCH_SKILL_WEIGHT = 20
+MATCH_EXPERIENCE_SCORE = 10
 
 def load_json_file(filepath: str) -> Any:
     """
     Load and parse a JSON file.
     
+    With orjson the file is memory-mapped and parsed in place, so large job
+    corpora are never copied into an intermediate bytes object.
+    
     Args:
         filepath: Path to the JSON file
         
     Returns:
         Parsed JSON data
     """
+    if not os.path.isfile(filepath):
+        logger.warning(f"JSON file not found: {filepath}")
+        return None
+    
     try:
+        if orjson is not None:
+            with open(filepath, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # The view must be released before the map can be closed
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
-        print(f"Error loading JSON file {filepath}: {str(e)}")
+        logger.error(f"Error loading JSON file {filepath}: {str(e)}")
         return None
 
-def save_json_file(filepath: str, data: Any) -> bool:
+def _dump_json_bytes(data: Any, indent: bool) -> bytes:
+    """
+    Serialize data to UTF-8 JSON bytes.
+    
+    Uses orjson when available; values it rejects (e.g. integers beyond
+    64 bits) go through the stdlib encoder instead.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            pass
+    text = json.dumps(data, indent=2 if indent else None, ensure_ascii=False)
+    return (text + "\n").encode('utf-8')
+
+def save_json_file(filepath: str, data: Any, indent: bool = True) -> bool:
     """
     Save data to a JSON file.
     
     Args:
         filepath: Path to save the JSON file
         data: Data to save
+        indent: Pretty-print with 2-space indentation (compact output is
+            smaller and faster to write)
         
     Returns:
         True if successful, False otherwise
     """
     try:
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        payload = _dump_json_bytes(data, indent)
+        with open(filepath, 'wb') as f:
+            f.write(payload)
         return True
     except Exception as e:
-        print(f"Error saving JSON file {filepath}: {str(e)}")
+        logger.error(f"Error saving JSON file {filepath}: {str(e)}")
         return False
 
+def _extract_pdf_text(filepath: str) -> str:
+    """
+    Extract the text of every page of a PDF.
+    
+    Uses the first available of PyMuPDF and pypdfium2 (both C engines, much
+    faster on large files), then PyPDF2.
+    
+    Args:
+        filepath: Path to the PDF file
+        
+    Returns:
+        Text of all pages, one page after another
+    """
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+    
+    if fitz is not None:
+        with fitz.open(filepath) as doc:
+            return "\n".join(page.get_text("text") for page in doc)
+    
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        pdfium = None
+    
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(filepath)
+        try:
+            pages = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_bounded())
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+        # PDFium separates lines with CRLF
+        return "\n".join(pages).replace("\r\n", "\n")
+    
+    from PyPDF2 import PdfReader
+    reader = PdfReader(filepath)
+    return "".join(page.extract_text() + "\n" for page in reader.pages)
+
+
+# WordprocessingML element tags used by _extract_docx_text
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P = _W_NS + 'p'
+_W_R = _W_NS + 'r'
+_W_HYPERLINK = _W_NS + 'hyperlink'
+_W_BR = _W_NS + 'br'
+_W_BR_TYPE = _W_NS + 'type'
+_W_T = _W_NS + 't'
+# Run content with a fixed text equivalent (w:br depends on its type)
+_W_RUN_CHARS = {
+    _W_NS + 'tab': '\t',
+    _W_NS + 'ptab': '\t',
+    _W_NS + 'cr': '\n',
+    _W_NS + 'noBreakHyphen': '-',
+}
+
+
+def _docx_run_text(run) -> str:
+    parts = []
+    for elem in run:
+        tag = elem.tag
+        if tag == _W_T:
+            parts.append(elem.text or '')
+        elif tag == _W_BR:
+            # Page and column breaks have no text equivalent
+            if elem.get(_W_BR_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif tag in _W_RUN_CHARS:
+            parts.append(_W_RUN_CHARS[tag])
+    return ''.join(parts)
+
+
+def _docx_paragraph_text(paragraph) -> str:
+    parts = []
+    for child in paragraph:
+        if child.tag == _W_R:
+            parts.append(_docx_run_text(child))
+        elif child.tag == _W_HYPERLINK:
+            parts.extend(_docx_run_text(run) for run in child.iterfind(_W_R))
+    return ''.join(parts)
+
+
+def _extract_docx_text(filepath: str) -> str:
+    """
+    Extract the text of the body paragraphs of a DOCX file.
+    
+    Streams word/document.xml straight out of the archive and frees each
+    top-level element once read, instead of loading the whole package into
+    python-docx's object model. Produces the same text as joining
+    python-docx's Document(filepath).paragraphs.
+    
+    Args:
+        filepath: Path to the DOCX file
+        
+    Returns:
+        Paragraph texts, one per line
+        
+    Raises:
+        zipfile.BadZipFile: If the file is not a zip archive (e.g. legacy .doc)
+        KeyError: If the archive has no word/document.xml
+    """
+    paragraphs = []
+    depth = 0
+    with zipfile.ZipFile(filepath) as archive, archive.open('word/document.xml') as xml_file:
+        for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            # Children of w:body: paragraphs, tables, section properties...
+            if depth == 2:
+                if elem.tag == _W_P:
+                    paragraphs.append(_docx_paragraph_text(elem))
+                elem.clear()
+    return "\n".join(paragraphs)
+
+
+def _read_text(filepath: str, errors: str = 'strict') -> str:
+    """
+    Read a UTF-8 text file with universal newlines.
+    
+    Same result as open(filepath, 'r', encoding='utf-8').read(), but decodes
+    the raw bytes in one call instead of going through a TextIOWrapper.
+    
+    Args:
+        filepath: Path to the file
+        errors: How to handle invalid UTF-8 (see bytes.decode)
+        
+    Returns:
+        File contents
+    """
+    with open(filepath, 'rb') as f:
+        text = f.read().decode('utf-8', errors)
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
 def extract_text_from_file(filepath: str) -> str:
     """
     Extract text from various file formats.
@@ -56,55 +261,156 @@ def extract_text_from_file(filepath: str) -> str:
         ext = os.path.splitext(filepath)[1].lower()
         
         if ext == '.txt':
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return f.read()
+            return _read_text(filepath)
         
         elif ext == '.pdf':
             try:
-                from PyPDF2 import PdfReader
-                reader = PdfReader(filepath)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+                return _extract_pdf_text(filepath)
             except Exception as e:
-                print(f"Error reading PDF: {str(e)}")
+                logger.error(f"Error reading PDF: {str(e)}")
                 return ""
         
         elif ext in ['.doc', '.docx']:
             try:
-                from docx import Document
-                doc = Document(filepath)
-                text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-                return text
+                try:
+                    return _extract_docx_text(filepath)
+                except (zipfile.BadZipFile, KeyError):
+                    # Not a standard DOCX package; let python-docx have a go
+                    from docx import Document
+                    doc = Document(filepath)
+                    return "\n".join([paragraph.text for paragraph in doc.paragraphs])
             except Exception as e:
-                print(f"Error reading DOCX: {str(e)}")
+                logger.error(f"Error reading DOCX: {str(e)}")
                 return ""
         
         else:
             # Try to read as plain text
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+            return _read_text(filepath, errors='ignore')
                 
     except Exception as e:
-        print(f"Error extracting text from {filepath}: {str(e)}")
+        logger.error(f"Error extracting text from {filepath}: {str(e)}")
         return ""
 
+def extract_text_batch(filepaths: List[str], max_workers: Optional[int] = None) -> List[str]:
+    """
+    Extract text from several files, spreading the work over processes.
+    
+    PDF and DOCX parsing is CPU-bound, so worker processes sidestep the GIL.
+    Small batches are extracted in-process, where pool start-up would cost
+    more than it saves.
+    
+    Args:
+        filepaths: Paths to the files
+        max_workers: Maximum number of worker processes (default: CPU count)
+        
+    Returns:
+        Extracted text content, in the order of filepaths
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(filepaths))
+    if workers < 2 or len(filepaths) < PARALLEL_EXTRACT_MIN_FILES:
+        return [extract_text_from_file(filepath) for filepath in filepaths]
+    
+    # Spawn rather than fork: the server process runs threads, and forking
+    # a threaded process can deadlock the child
+    chunksize = max(1, len(filepaths) // (workers * 4))
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        return list(executor.map(extract_text_from_file, filepaths, chunksize=chunksize))
+
+# Same shapes datetime.strptime(..., '%Y-%m-%d') accepts
+ISO_DATE_PATTERN = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+
+@functools.lru_cache(maxsize=4096)
+def _format_iso_date(date_str: str) -> str:
+    match = ISO_DATE_PATTERN.fullmatch(date_str)
+    if match is None:
+        return date_str
+    year, month, day = map(int, match.groups())
+    try:
+        return date(year, month, day).strftime('%B %d, %Y')
+    except ValueError:
+        # Out-of-range day or month, e.g. 2024-02-30
+        return date_str
+
 def format_date(date_str: str) -> str:
     """
     Format a date string to a standard format.
     
     Args:
-        date_str: Input date string
+        date_str: Input date string (YYYY-MM-DD)
         
     Returns:
-        Formatted date string
+        Formatted date string, or the input unchanged if it is not a valid date
     """
-    try:
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        return date_obj.strftime('%B %d, %Y')
-    except:
+    if not isinstance(date_str, str):
         return date_str
+    return _format_iso_date(date_str)
+
+@functools.lru_cache(maxsize=1024)
+def _requirement_words(requirements: tuple) -> frozenset:
+    # One split over the joined text instead of a generator per requirement
+    return frozenset([word.lower() for word in ' '.join(requirements).split() if len(word) > 3])
+
+@functools.lru_cache(maxsize=256)
+def _lowered_skills(skills: tuple) -> frozenset:
+    return frozenset(s.lower() for s in skills)
+
+def job_skill_set(job_data: Dict) -> frozenset:
+    """
+    Get the lowercased requirement words (longer than 3 characters) of a job.
+    
+    Results are cached on the requirement strings, so matching many CVs
+    against the same jobs tokenizes each job only once.
+    
+    Args:
+        job_data: Job offer data
+        
+    Returns:
+        Set of requirement words
+    """
+    return _requirement_words(tuple(job_data.get('requirements') or ()))
+
+def cv_skill_set(cv_data: Dict) -> frozenset:
+    """
+    Get the lowercased skills of a CV.
+    
+    Args:
+        cv_data: Parsed CV data
+        
+    Returns:
+        Set of skills
+    """
+    return _lowered_skills(tuple(cv_data.get('skills') or ()))
+
+def make_match_scorer(
+    similarity_weight: float = MATCH_SIMILARITY_WEIGHT,
+    skill_weight: float = MATCH_SKILL_WEIGHT,
+    experience_score: float = MATCH_EXPERIENCE_SCORE
+) -> Callable[[float, int, int], float]:
+    """
+    Build a match scoring function with fixed weights.
+    
+    The weights are bound once in the returned closure, so scoring a pair only
+    does the arithmetic on precomputed skill counts.
+    
+    Args:
+        similarity_weight: Points for a similarity score of 1.0
+        skill_weight: Points when the CV covers every job skill
+        experience_score: Flat bonus for experience level
+        
+    Returns:
+        Function (similarity_score, shared_skills, job_skill_count) -> match
+        score capped at 100
+    """
+    def scorer(similarity_score: float, shared_skills: int, job_skill_count: int) -> float:
+        skill_score = shared_skills / job_skill_count * skill_weight if job_skill_count else 0
+        return min(similarity_score * similarity_weight + skill_score + experience_score, 100)
+    
+    return scorer
+
+
+_score_match = make_match_scorer()
 
 def calculate_match_score(cv_data: Dict, job_data: Dict, similarity_score: float) -> float:
     """
@@ -118,28 +424,86 @@ def calculate_match_score(cv_data: Dict, job_data: Dict, similarity_score: float
     Returns:
         Match score between 0 and 100
     """
-    # Base score from NLP similarity (70% weight)
-    base_score = similarity_score * 70
+    job_skills = job_skill_set(job_data)
+    shared_skills = len(cv_skill_set(cv_data) & job_skills)
+    return _score_match(similarity_score, shared_skills, len(job_skills))
+
+class JobSkillMatrix:
+    """
+    Columnar skill data for a fixed list of jobs.
     
-    # Bonus points for skill matches (20% weight)
-    cv_skills = set([s.lower() for s in cv_data.get('skills', [])])
-    job_requirements = job_data.get('requirements', [])
-    job_skills = set()
-    for req in job_requirements:
-        job_skills.update([word.lower() for word in req.split() if len(word) > 3])
+    Holds the job-skill vocabulary, a job x skill presence matrix and the
+    per-job skill counts, so several CV batches can be scored against the
+    same jobs without tokenizing or re-encoding them.
+    """
     
-    if cv_skills and job_skills:
-        skill_match = len(cv_skills.intersection(job_skills)) / max(len(job_skills), 1)
-        skill_score = skill_match * 20
-    else:
-        skill_score = 0
+    __slots__ = ('vocabulary', 'matrix', 'sizes')
     
-    # Bonus for experience level (10% weight)
-    experience_score = 10  # Default
+    def __init__(self, jobs: List[Dict]):
+        """
+        Build the matrix for a list of jobs.
+        
+        Args:
+            jobs: Job offer data
+        """
+        skill_sets = [job_skill_set(job) for job in jobs]
+        self.vocabulary = {}
+        for skills in skill_sets:
+            for skill in skills:
+                self.vocabulary.setdefault(skill, len(self.vocabulary))
+        
+        # float32 matmul goes through BLAS and is exact for these small counts
+        self.matrix = np.zeros((len(jobs), len(self.vocabulary)), dtype=np.float32)
+        for row, skills in enumerate(skill_sets):
+            self.matrix[row, [self.vocabulary[skill] for skill in skills]] = 1
+        self.sizes = self.matrix.sum(axis=1, dtype=np.float64)
+    
+    def overlap(self, cvs: List[Dict]) -> np.ndarray:
+        """
+        Count the skills each CV shares with each job.
+        
+        Args:
+            cvs: Parsed CV data
+            
+        Returns:
+            Shared skill counts, shape (len(cvs), number of jobs)
+        """
+        cv_matrix = np.zeros((len(cvs), len(self.vocabulary)), dtype=np.float32)
+        for row, cv in enumerate(cvs):
+            cv_matrix[row, [self.vocabulary[s] for s in cv_skill_set(cv) if s in self.vocabulary]] = 1
+        return (cv_matrix @ self.matrix.T).astype(np.float64)
+
+
+def score_batch(
+    cvs: List[Dict],
+    jobs: Union[List[Dict], JobSkillMatrix],
+    similarity_scores: np.ndarray
+) -> np.ndarray:
+    """
+    Calculate match scores for every CV/job pair at once.
     
-    total_score = base_score + skill_score + experience_score
+    Same scoring as calculate_match_score, with the skill overlaps of all
+    pairs computed as a single product of skill-presence matrices.
     
-    return min(total_score, 100)  # Cap at 100
+    Args:
+        cvs: Parsed CV data
+        jobs: Job offer data, or a JobSkillMatrix built from it for reuse
+            across calls
+        similarity_scores: NLP similarity scores, shape (len(cvs), len(jobs))
+        
+    Returns:
+        Match scores between 0 and 100, shape (len(cvs), len(jobs))
+    """
+    if not isinstance(jobs, JobSkillMatrix):
+        jobs = JobSkillMatrix(jobs)
+    
+    overlap = jobs.overlap(cvs)
+    job_sizes = np.maximum(jobs.sizes, 1)
+    
+    base_score = np.asarray(similarity_scores, dtype=np.float64) * MATCH_SIMILARITY_WEIGHT
+    skill_score = overlap / job_sizes * MATCH_SKILL_WEIGHT
+    
+    return np.minimum(base_score + skill_score + MATCH_EXPERIENCE_SCORE, 100)
 
 def create_cv_summary(cv_data: Dict) -> str:
     """
@@ -243,6 +607,19 @@ def create_job_summary(job_data: Dict) -> str:
     return "\n".join(parts)
 
 
+# Field mapping for get_job_field: old_name -> (old_name, new_name)
+JOB_FIELD_MAPPING = {
+    'title': ('title',),
+    'company': ('company', 'organization'),
+    'location': ('location', 'locations_derived'),
+    'type': ('type', 'employment_type'),
+    'description': ('description', 'description_text'),
+    'seniority': ('seniority',),
+    'remote': ('remote_derived',),
+    'application_email': ('application_email',)
+}
+
+
 def get_job_field(job_data: Dict, field_name: str) -> str:
     """
     Get a job field value with format-agnostic field mapping.
@@ -261,19 +638,7 @@ def get_job_field(job_data: Dict, field_name: str) -> str:
     Returns:
         Field value as string
     """
-    # Field mapping: old_name -> [old_name, new_name]
-    field_mapping = {
-        'title': ['title'],
-        'company': ['company', 'organization'],
-        'location': ['location', 'locations_derived'],
-        'type': ['type', 'employment_type'],
-        'description': ['description', 'description_text'],
-        'seniority': ['seniority'],
-        'remote': ['remote_derived'],
-        'application_email': ['application_email']
-    }
-    
-    fields_to_check = field_mapping.get(field_name, [field_name])
+    fields_to_check = JOB_FIELD_MAPPING.get(field_name) or (field_name,)
     
     for field in fields_to_check:
         value = job_data.get(field)
@@ -294,6 +659,38 @@ def get_job_field(job_data: Dict, field_name: str) -> str:
     return ''
 
 
+class _FilenameCharTable(dict):
+    """
+    str.translate table keeping alphanumeric characters, spaces, hyphens and
+    underscores, and deleting everything else.
+    
+    Characters are classified on first sight and the result stored, so
+    translate runs in C for every character seen before.
+    """
+    
+    def __missing__(self, codepoint: int):
+        char = chr(codepoint)
+        value = char if char.isalnum() or char in ' -_' else None
+        self[codepoint] = value
+        return value
+
+
+_FILENAME_CHAR_TABLE = _FilenameCharTable()
+
+
+def strip_filename_chars(text: str) -> str:
+    """
+    Keep only alphanumeric characters, spaces, hyphens, and underscores.
+    
+    Args:
+        text: Text to clean
+        
+    Returns:
+        Cleaned text with surrounding whitespace stripped
+    """
+    return text.translate(_FILENAME_CHAR_TABLE).strip()
+
+
 def sanitize_filename(text: str) -> str:
     """
     Sanitize text for use in filenames.
@@ -305,31 +702,60 @@ def sanitize_filename(text: str) -> str:
     Returns:
         Sanitized text safe for filenames
     """
-    # Keep only alphanumeric characters, spaces, hyphens, and underscores
-    safe_text = "".join(c for c in text if c.isalnum() or c in (' ', '-', '_'))
     # Strip and replace spaces with underscores
-    return safe_text.strip().replace(' ', '_')
+    return strip_filename_chars(text).replace(' ', '_')
+
+
+@functools.lru_cache(maxsize=256)
+def _guess_mime_type(path: str) -> str:
+    mime_type, _ = mimetypes.guess_type(path)
+    
+    # Default to octet-stream if unknown
+    if mime_type is None:
+        mime_type = 'application/octet-stream'
+    
+    return mime_type
 
 
 def get_mime_type(filepath: str) -> str:
     """
     Get MIME type for a file based on its extension.
     
+    Lookups are cached per extension, so only the first file of each type
+    goes through the mimetypes registry.
+    
     Args:
         filepath: Path to the file
         
     Returns:
         MIME type string (e.g., 'application/pdf')
     """
-    # Initialize mimetypes if not already done
-    if not mimetypes.inited:
-        mimetypes.init()
+    ext = os.path.splitext(filepath)[1]
     
-    # Get MIME type from extension
-    mime_type, _ = mimetypes.guess_type(filepath)
+    # Compression suffixes (e.g. .tar.gz) depend on the extension before them
+    if ext in mimetypes.encodings_map:
+        return _guess_mime_type(filepath)
     
-    # Default to octet-stream if unknown
-    if mime_type is None:
-        mime_type = 'application/octet-stream'
+    return _guess_mime_type('file' + ext)
+
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code.
     
-    return mime_type
+    When called from inside a running event loop (e.g. a sync helper invoked
+    by an async FastAPI route), the coroutine runs on a worker thread with its
+    own loop instead, since asyncio.run() cannot be nested.
+    
+    Args:
+        coro: Coroutine to run
+        
+    Returns:
+        The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()